@@ -1,7 +1,9 @@
 import copy
+import io
 import json
 import multiprocessing
 import os
+import pickle
 from multiprocessing import Process
 import webbrowser
 import logging
@@ -9,7 +11,10 @@ import logging
 from flask import Flask
 from flask_cors import CORS
 
-from DIAL.Simulator import Simulator
+from DIAL.Simulator import Algorithm, ConditionHook, Simulator
+from DIAL.Snapshot import load_snapshot, save_snapshot
+from DIAL.Topology import Topology, DefaultTopologies
+from DIAL.API.BinaryEndpoints import BinaryEndpoints
 from DIAL.API.ControlEndpoints import ControlEndpoints
 from DIAL.API.MessageEndpoints import MessageEndpoints
 from DIAL.API.StateEndpoints import StateEndpoints
@@ -22,15 +27,30 @@ class API:
     host: str
     port: int
     api: Flask
-    initial_simulator: Simulator
+    initial_snapshot: io.BytesIO | None
+    initial_simulator: Simulator | None  # Only used if the initial simulator can not be stored in a snapshot
+    initial_journal_length: int
+    modified: bool  # The simulator was changed through the API since the start or the last reset
 
     control_endpoint: ControlEndpoints
     message_endpoint: MessageEndpoints
     state_endpoint: StateEndpoints
     topology_endpoint: TopologyEndpoints
+    binary_endpoint: BinaryEndpoints
 
     def __init__(self, simulator: Simulator, host: str = "localhost", port: int = 10101, verbose: bool = False, open_browser: bool = True):
-        self.initial_simulator = copy.deepcopy(simulator)
+        # A reset usually only undoes the steps that were taken since the start. The compact snapshot of the initial
+        # simulator is only loaded if the simulator was modified through the API, as these changes are not journaled.
+        self.initial_snapshot = io.BytesIO()
+        self.initial_simulator = None
+        try:
+            save_snapshot(simulator, self.initial_snapshot, include_topology=False)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # Data that can not be pickled (e.g. lambdas or open files) can still be deep-copied
+            self.initial_snapshot = None
+            self.initial_simulator = copy.deepcopy(simulator)
+        self.initial_journal_length = len(simulator.journal)
+        self.modified = False
 
         self.simulator = simulator
         self.host = host
@@ -46,9 +66,12 @@ class API:
         self.message_endpoint = MessageEndpoints(api=self)
         self.state_endpoint = StateEndpoints(api=self)
         self.topology_endpoint = TopologyEndpoints(api=self)
+        self.binary_endpoint = BinaryEndpoints(api=self)
 
         self.api.route('/topology', methods=['GET'])(self.topology_endpoint.get_topology)
 
+        self.api.route('/binary/<digest>', methods=['GET'])(self.binary_endpoint.get_binary)
+
         self.api.route('/states', methods=['GET'])(self.state_endpoint.get_states)
         self.api.route('/state/<node>/<algorithm>/<instance>', methods=['GET'])(self.state_endpoint.get_state)
         self.api.route('/state/<node>/<algorithm>/<instance>', methods=['PUT'])(self.state_endpoint.put_state)
@@ -66,12 +89,21 @@ class API:
         self.api.route('/step-backward/<steps_str>', methods=['GET'])(self.control_endpoint.get_step_backward)
         self.api.route('/time-forward/<time_str>', methods=['GET'])(self.control_endpoint.get_time_forward)
         self.api.route('/time-backward/<time_str>', methods=['GET'])(self.control_endpoint.get_time_backward)
+        self.api.route('/seek/<time_str>/<theta_str>', methods=['GET'])(self.control_endpoint.get_seek)
 
         p = Process(target=self.run)
         p.start()
         if open_browser:
             webbrowser.open(f"https://{host}:{port}/index.html", new=0, autoraise=True)
 
+    @classmethod
+    def from_snapshot(cls, path: str, algorithms: dict[str, Algorithm], condition_hooks: list[ConditionHook] = [],
+                      topology: Topology | DefaultTopologies | None = None, host: str = "localhost", port: int = 10101,
+                      verbose: bool = False, open_browser: bool = True) -> 'API':
+        # Starts the frontend at the position of a snapshot that was stored with save_snapshot
+        simulator = load_snapshot(path, algorithms=algorithms, condition_hooks=condition_hooks, topology=topology)
+        return cls(simulator=simulator, host=host, port=port, verbose=verbose, open_browser=open_browser)
+
     def response(self, status: int, response: any):
         response = self.api.response_class(
             response=json.dumps(response, indent=4, default=str),
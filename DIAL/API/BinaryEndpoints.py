@@ -0,0 +1,19 @@
+from DIAL.BinaryPayload import BinaryPayload
+
+
+class BinaryEndpoints:
+    api: any
+
+    def __init__(self, api: any):
+        self.api = api
+
+    def get_binary(self, digest: str):
+        # Messages and states only contain descriptors of their binary payloads. The data is fetched on demand.
+        payload = BinaryPayload.get(digest)
+        if payload is None:
+            return self.api.response(status=404, response=f'No binary payload with digest "{digest}"')
+        return self.api.api.response_class(
+            response=payload.to_bytes(),
+            status=200,
+            mimetype="application/octet-stream"
+        )
@@ -1,6 +1,10 @@
 import copy
 import sys
+from flask import request
+from DIAL.Color import DefaultColors
 from DIAL.Message import Message
+from DIAL.Simulator import RunResult
+from DIAL.Snapshot import load_snapshot
 
 
 class ControlEndpoints:
@@ -9,8 +13,44 @@ class ControlEndpoints:
     def __init__(self, api: any):
         self.api = api
 
+    def get_detail(self) -> str | None:
+        # How much is returned about the executed steps: every action (full), aggregate counts (summary) or only
+        # the final position (none). Without actions the steps are executed headless.
+        detail = request.args.get("detail", "full")
+        if detail not in ["none", "summary", "full"]:
+            return None
+        return detail
+
+    def run_response(self, run_result: RunResult, detail: str):
+        result: dict[str, any] = {
+            "time": None if self.api.simulator.time is None else int(self.api.simulator.time),
+            "theta": None if self.api.simulator.theta is None else int(self.api.simulator.theta),
+            "steps": int(run_result.steps),
+        }
+        if detail == "summary":
+            result["sent_messages"] = int(run_result.sent_messages)
+            result["lost_messages"] = int(run_result.lost_messages)
+        return self.api.response(status=200, response=result)
+
     def get_reset(self):
-        self.api.simulator = copy.deepcopy(self.api.initial_simulator)
+        simulator = self.api.simulator
+        if self.api.modified:
+            if self.api.initial_snapshot is not None:
+                # Steps taken before the start can not be undone after the snapshot was loaded
+                self.api.initial_snapshot.seek(0)
+                self.api.simulator = load_snapshot(self.api.initial_snapshot, algorithms=simulator.algorithms,
+                                                   condition_hooks=simulator.condition_hooks,
+                                                   topology=simulator.topology)
+            else:
+                self.api.simulator = copy.deepcopy(self.api.initial_simulator)
+            self.api.initial_journal_length = len(self.api.simulator.journal)
+            self.api.modified = False
+        else:
+            # Undoing without building the summaries that step_backward returns
+            while len(simulator.journal) > self.api.initial_journal_length:
+                simulator._undo_step()
+            if len(simulator.journal) < self.api.initial_journal_length:
+                simulator.run(max_steps=self.api.initial_journal_length - len(simulator.journal))
         return self.api.response(status=200, response="OK")
 
     def get_reschedule(self, message_id: str, time_str: str, theta_str: str):
@@ -67,19 +107,10 @@ class ControlEndpoints:
         if time in self.api.simulator.messages.keys() and theta > len(self.api.simulator.messages[time]):
             return self.api.response(status=300, response=f'Theta is out of range for time={time}')
         # Remove the message from its old place
-        for index in range(original_theta + 1, len(self.api.simulator.messages[original_time])):
-            self.api.simulator.messages[original_time][index]._arrival_theta -= 1
-        self.api.simulator.messages[original_time].remove(message)
-        if len(self.api.simulator.messages[original_time]) == 0:
-            del self.api.simulator.messages[original_time]
+        self.api.simulator.messages.remove(message)
         # Insert the message into its new place
-        if time not in self.api.simulator.messages.keys():
-            self.api.simulator.messages[time] = []
-        self.api.simulator.messages[time].insert(theta, message)
-        message._arrival_time = time
-        message._arrival_theta = theta
-        for index in range(theta + 1, len(self.api.simulator.messages[time])):
-            self.api.simulator.messages[time][index]._arrival_theta += 1
+        self.api.simulator.messages.insert(message, time, theta)
+        self.api.modified = True
         return self.api.response(status=200, response=f'OK')
 
     def get_step_forward(self, steps_str: str):
@@ -88,6 +119,11 @@ class ControlEndpoints:
             steps = int(steps_str)
         except ValueError:
             return self.api.response(status=300, response="Failed to parse steps")
+        detail = self.get_detail()
+        if detail is None:
+            return self.api.response(status=300, response="Invalid detail, expected none, summary or full")
+        if detail != "full":
+            return self.run_response(self.api.simulator.run(max_steps=max(steps, 0)), detail)
 
         result: dict[str, any] = {
             "time": self.api.simulator.time,
@@ -138,6 +174,21 @@ class ControlEndpoints:
             time = int(time_str)
         except ValueError:
             return self.api.response(status=300, response="Failed to parse steps")
+        detail = self.get_detail()
+        if detail is None:
+            return self.api.response(status=300, response="Invalid detail, expected none, summary or full")
+        if detail != "full":
+            run_result = RunResult()
+            if self.api.simulator.time is None:
+                run_result = self.api.simulator.run(max_steps=1)
+                if run_result.steps == 0:
+                    return self.run_response(run_result, detail)
+            minimum_target_time = self.api.simulator.time + time
+            remaining_result = self.api.simulator.run(until=lambda simulator: simulator.time >= minimum_target_time)
+            run_result.steps += remaining_result.steps
+            run_result.sent_messages += remaining_result.sent_messages
+            run_result.lost_messages += remaining_result.lost_messages
+            return self.run_response(run_result, detail)
 
         result: dict[str, any] = {
             "time": self.api.simulator.time,
@@ -202,3 +253,36 @@ class ControlEndpoints:
                     return self.api.response(status=200, response=result)
 
         return self.api.response(status=200, response=result)
+
+    def get_seek(self, time_str: str, theta_str: str):
+        time: int = None
+        theta: int = None
+        try:
+            time = int(time_str)
+            theta = int(theta_str)
+        except ValueError:
+            return self.api.response(status=300, response="Failed to parse time or theta")
+
+        seek_result = self.api.simulator.seek(time, theta)
+        # Only the states that were touched on the way are returned. States that no longer exist are None.
+        states: dict[str, any] = {}
+        for address in seek_result.changed_addresses:
+            if address not in self.api.simulator.states.keys():
+                states[str(address)] = None
+                continue
+            state = self.api.simulator.states[address][-1]
+            color_object = state.color
+            if isinstance(color_object, DefaultColors):
+                color_object = color_object.value
+            states[str(address)] = {
+                "color": color_object.__str__(),
+                "neighbors": state.neighbors
+            }
+        result: dict[str, any] = {
+            "time": None if seek_result.time is None else int(seek_result.time),
+            "theta": None if seek_result.theta is None else int(seek_result.theta),
+            "steps": seek_result.steps,
+            "reached": seek_result.reached,
+            "states": states
+        }
+        return self.api.response(status=200, response=result)
@@ -1,5 +1,6 @@
 from DIAL.Message import Message, MessageParser
 from DIAL.Error import Error
+from DIAL.FrozenData import freeze
 from DIAL.Topology import EdgeConfig
 from flask import request
 
@@ -11,7 +12,7 @@ class MessageEndpoints:
 
     def get_messages(self):
         messages: dict[int, list[Message]] = {}
-        for t in sorted(list(self.api.simulator.messages.keys())):
+        for t in self.api.simulator.messages.times():
             messages[int(t)] = [msg.summary() for msg in self.api.simulator.messages[t]]
         response_data = {
             "time": self.api.simulator.time,
@@ -40,18 +41,9 @@ class MessageEndpoints:
             child = self.api.simulator.get_message(child_id)
             if child is not None:
                 child._parent_message = None
-        # Modify the arrival theta of all messages with the same time
-        time = message._arrival_time
-        theta = message._arrival_time
-        if len(self.api.simulator.messages[time]) > theta + 1:
-            for n in range(0, len(self.api.simulator.messages[time])):
-                msg = self.api.simulator.messages[time][n]
-                if msg._arrival_theta > theta:
-                    msg._arrival_theta -= 1
-        # Remove the message from the simulator
-        self.api.simulator.messages[time].remove(message)
-        if len(self.api.simulator.messages[time]) == 0:
-            del self.api.simulator.messages[time]
+        # Remove the message from the simulator and shift the arrival theta of all messages with the same time
+        self.api.simulator.messages.remove(message)
+        self.api.modified = True
         return self.api.response(status=200, response=f'OK')
 
     def add_message(self):
@@ -75,6 +67,7 @@ class MessageEndpoints:
                 return self.api.response(status=400,
                                          response="No edge exists between nodes in message.source and message.target")
             self.api.simulator.insert_message_to_queue(message, time=message._arrival_time, theta=message._arrival_theta, is_lost=message._is_lost)
+        self.api.modified = True
         return self.api.response(status=200, response=f'OK')
 
     def put_message(self, message_id: str):
@@ -109,9 +102,14 @@ class MessageEndpoints:
         old_message.color = new_message.color
         old_message.target_address = new_message.target_address
         old_message.source_address = new_message.source_address
-        for key in list(old_message.data.keys()):
-            del old_message.data[key]
-        old_message.data |= new_message.data
+        self.api.simulator.messages.refresh(old_message)
+        # Frozen payloads can not be changed and might be shared, so they are replaced instead
+        if self.api.simulator.frozen_payloads:
+            old_message.data = freeze(new_message.data)
+        else:
+            for key in list(old_message.data.keys()):
+                del old_message.data[key]
+            old_message.data |= new_message.data
 
         old_message._is_lost = new_message._is_lost
         old_message._is_self_message = new_message._is_self_message
@@ -120,5 +118,6 @@ class MessageEndpoints:
         old_message._arrival_theta = new_message._arrival_theta
         old_message._creation_time = new_message._creation_time
         old_message._creation_theta = new_message._creation_theta
+        self.api.modified = True
 
         return self.api.response(status=200, response=old_message.to_json())
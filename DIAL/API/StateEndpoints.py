@@ -56,25 +56,17 @@ class StateEndpoints:
                 return self.api.response(status=300, response=f'Invalid attribute message.{key}')
         if new_state.address != old_state.address:
             return self.api.response(status=400, response=f'Modifying state.address is not allowed')
-        node_colors = self.api.simulator.node_colors
-        latest_time_tuple = None
-        for time_tuple in node_colors.keys():
-            if old_state.address not in node_colors[time_tuple].keys():
-                continue
-            if time_tuple[0] is None and time_tuple[1] is None:
-                latest_time_tuple = time_tuple
-                break
-            if latest_time_tuple is None:
-                latest_time_tuple = time_tuple
-                continue
-            if (time_tuple[0] > latest_time_tuple[0]) or (time_tuple[0] == latest_time_tuple[0] and time_tuple[1] > latest_time_tuple[1]):
-                latest_time_tuple = time_tuple
-                continue
+        latest_time_tuple = self.api.simulator.find_latest_step(old_state.address)
         if latest_time_tuple is None:
             return self.api.response(status=400, response=f'Can not change color :( OH No! This error should never happen...')
-        node_colors[latest_time_tuple][old_state.address] = new_state.color
-        old_state.neighbors = new_state.neighbors
-        old_state.color = new_state.color
-        old_state.data = new_state.data
+        # In delta encoded mode there might be no recorded transition for the latest step yet
+        self.api.simulator.node_colors.setdefault(latest_time_tuple, {})[old_state.address] = new_state.color
+        self.api.simulator.node_neighbors.setdefault(latest_time_tuple, {})[old_state.address] = new_state.neighbors
+        # The latest version is replaced instead of changed in place. In delta encoded mode the previous version is
+        # rebuilt from the latest one, so in-place changes would leak into the history.
+        history = self.api.simulator.states[address]
+        history.pop()
+        history.append(new_state)
+        self.api.modified = True
 
         return self.api.response(status=200, response=new_state.to_json())
@@ -1,13 +1,49 @@
 
 class Address:
+    # Addresses are immutable and interned: there is exactly one object per distinct address, so addresses can
+    # be compared by identity and their hash is computed only once. Use copy() to derive a different address.
+    __slots__ = ("node_name", "algorithm", "instance", "_string", "_hash")
+
     node_name: str
     algorithm: str
     instance: str
 
-    def __init__(self, node_name: str, algorithm: str, instance: str):
-        self.node_name = node_name
-        self.algorithm = algorithm
-        self.instance = instance
+    _string: str
+    _hash: int
+
+    _instances: dict[tuple[str, str, str], 'Address'] = {}
+    _parsed: dict[str, 'Address'] = {}
+
+    def __new__(cls, node_name: str, algorithm: str, instance: str):
+        key = (node_name, algorithm, instance)
+        address = cls._instances.get(key)
+        if address is not None:
+            return address
+        address = object.__new__(cls)
+        object.__setattr__(address, "node_name", node_name)
+        object.__setattr__(address, "algorithm", algorithm)
+        object.__setattr__(address, "instance", instance)
+        object.__setattr__(address, "_string", f"{node_name}/{algorithm}/{instance}")
+        object.__setattr__(address, "_hash", hash(address._string))
+        # setdefault keeps a single object even if two threads create the same address at once
+        return cls._instances.setdefault(key, address)
+
+    def __setattr__(self, name: str, value: any):
+        argument = "node" if name == "node_name" else name
+        raise AttributeError(f"Address is immutable. Use address.copy({argument}=...) to derive a new address.")
+
+    def __delattr__(self, name: str):
+        raise AttributeError("Address is immutable.")
+
+    def __reduce__(self):
+        # Unpickled addresses are interned again
+        return Address, (self.node_name, self.algorithm, self.instance)
+
+    def __copy__(self) -> 'Address':
+        return self
+
+    def __deepcopy__(self, memo: dict[int, any]) -> 'Address':
+        return self
 
     def copy(self, node: str = None, algorithm: str = None, instance: str = None):
         if node is None:
@@ -19,31 +55,27 @@ class Address:
         return Address(node, algorithm, instance)
 
     def __repr__(self):
-        return f"{self.node_name}/{self.algorithm}/{self.instance}"
+        return self._string
 
     def __eq__(self, other) -> bool:
-        if other.__class__.__name__ != "Address":
-            return False
-        if self.node_name != other.node_name:
-            return False
-        if self.algorithm != other.algorithm:
-            return False
-        if self.instance != other.instance:
-            return False
-        return True
+        return self is other
 
     def __hash__(self):
-        return hash(str(self))
+        return self._hash
 
     def to_json(self):
-        return f"{self}"
+        return self._string
 
     @classmethod
     def from_string(cls, string: str):
         if not isinstance(string, str):
             return None
+        address = cls._parsed.get(string)
+        if address is not None:
+            return address
         address_array = string.split("/")
         if len(address_array) != 3:
             return None
         address = Address(node_name=address_array[0], algorithm=address_array[1], instance=address_array[2])
+        cls._parsed[string] = address
         return address
@@ -0,0 +1,121 @@
+import hashlib
+import weakref
+
+import numpy
+
+
+def _digest(buffer: bytes, dtype: str | None, shape: tuple[int, ...]) -> str:
+    # The digest of raw bytes is the SHA-256 of the bytes. For arrays the dtype and shape are part of the content.
+    sha256 = hashlib.sha256()
+    if dtype is not None:
+        sha256.update(f"{dtype}{list(shape)}".encode())
+    sha256.update(buffer)
+    return sha256.hexdigest()
+
+
+class BinaryPayload:
+    # Immutable bytes or numpy array that can be put into the data of messages and states. Payloads are stored once
+    # per distinct content and keyed by their digest, so copying a message or state only copies the reference.
+    # A payload is kept in the store as long as it is referenced.
+    __slots__ = ("digest", "dtype", "shape", "_buffer", "__weakref__")
+
+    digest: str
+    dtype: str | None  # None for raw bytes
+    shape: tuple[int, ...]
+
+    _buffer: bytes
+
+    _store: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+    def __new__(cls, value: 'bytes | bytearray | memoryview | numpy.ndarray | BinaryPayload'):
+        if isinstance(value, BinaryPayload):
+            return value
+        if isinstance(value, numpy.ndarray):
+            if value.dtype.hasobject:
+                raise TypeError("A BinaryPayload can not be created from an array of Python objects.")
+            # The only copy of the data that is ever made
+            return cls._intern(value.tobytes(), value.dtype.str, tuple(int(n) for n in value.shape))
+        buffer = bytes(value)
+        return cls._intern(buffer, None, (len(buffer),))
+
+    @classmethod
+    def _intern(cls, buffer: bytes, dtype: str | None, shape: tuple[int, ...]) -> 'BinaryPayload':
+        digest = _digest(buffer, dtype, shape)
+        payload = cls._store.get(digest)
+        if payload is not None:
+            return payload
+        payload = object.__new__(cls)
+        object.__setattr__(payload, "digest", digest)
+        object.__setattr__(payload, "dtype", dtype)
+        object.__setattr__(payload, "shape", shape)
+        object.__setattr__(payload, "_buffer", buffer)
+        return cls._store.setdefault(digest, payload)
+
+    @classmethod
+    def get(cls, digest: str) -> 'BinaryPayload | None':
+        return cls._store.get(digest)
+
+    def __setattr__(self, name: str, value: any):
+        raise AttributeError("BinaryPayload is immutable.")
+
+    def __reduce__(self):
+        return BinaryPayload._intern, (self._buffer, self.dtype, self.shape)
+
+    def __copy__(self) -> 'BinaryPayload':
+        return self
+
+    def __deepcopy__(self, memo: dict[int, any]) -> 'BinaryPayload':
+        return self
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def __repr__(self) -> str:
+        return f"BinaryPayload(digest={self.digest[:12]}, dtype={self.dtype}, shape={self.shape})"
+
+    def array(self) -> numpy.ndarray:
+        # A read-only view of the stored data, nothing is copied
+        if self.dtype is None:
+            return numpy.frombuffer(self._buffer, dtype=numpy.uint8)
+        return numpy.frombuffer(self._buffer, dtype=numpy.dtype(self.dtype)).reshape(self.shape)
+
+    def to_bytes(self) -> bytes:
+        return self._buffer
+
+    def descriptor(self) -> dict[str, any]:
+        return {
+            "binary": self.digest,
+            "dtype": self.dtype,
+            "shape": list(self.shape),
+            "size": len(self._buffer)
+        }
+
+
+def encode_binary_payloads(value: any) -> any:
+    # Replaces payloads, numpy arrays and bytes by descriptors so that data can be rendered as JSON.
+    # Only BinaryPayload objects are kept in the store, so only their descriptors contain a digest that can be
+    # fetched from the API. Bare arrays and bytes are described without hashing their content.
+    if isinstance(value, BinaryPayload):
+        return value.descriptor()
+    if isinstance(value, (bytes, bytearray)):
+        return {"dtype": None, "shape": [len(value)], "size": len(value)}
+    if isinstance(value, numpy.ndarray) and not value.dtype.hasobject:
+        return {"dtype": value.dtype.str, "shape": [int(n) for n in value.shape], "size": int(value.nbytes)}
+    if isinstance(value, dict):
+        return {key: encode_binary_payloads(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_binary_payloads(item) for item in value]
+    return value
+
+
+def decode_binary_payloads(value: any) -> any:
+    # Replaces the descriptors of stored payloads by the payloads themselves
+    if isinstance(value, dict):
+        if value.keys() == {"binary", "dtype", "shape", "size"} and isinstance(value["binary"], str):
+            payload = BinaryPayload.get(value["binary"])
+            if payload is not None:
+                return payload
+        return {key: decode_binary_payloads(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_binary_payloads(item) for item in value]
+    return value
@@ -2,31 +2,56 @@ from enum import Enum
 
 
 class Color:
+    # Colors are immutable and interned like addresses: there is exactly one object per distinct color
+    __slots__ = ("red", "green", "blue", "_string", "_hash")
+
     red: int
     green: int
     blue: int
 
-    def __init__(self, r=255, g=255, b=255):
-        self.red = r
-        self.green = g
-        self.blue = b
+    _string: str
+    _hash: int
+
+    _instances: dict[tuple[int, int, int], 'Color'] = {}
+
+    def __new__(cls, r=255, g=255, b=255):
+        key = (int(r), int(g), int(b))
+        color = cls._instances.get(key)
+        if color is not None:
+            return color
+        color = object.__new__(cls)
+        object.__setattr__(color, "red", key[0])
+        object.__setattr__(color, "green", key[1])
+        object.__setattr__(color, "blue", key[2])
+        object.__setattr__(color, "_string", "#%02X%02X%02X" % key)
+        object.__setattr__(color, "_hash", hash(key))
+        return cls._instances.setdefault(key, color)
+
+    def __setattr__(self, name: str, value: any):
+        raise AttributeError("Color is immutable. Create a new Color instead.")
+
+    def __delattr__(self, name: str):
+        raise AttributeError("Color is immutable.")
+
+    def __reduce__(self):
+        return Color, (self.red, self.green, self.blue)
+
+    def __copy__(self) -> 'Color':
+        return self
+
+    def __deepcopy__(self, memo: dict[int, any]) -> 'Color':
+        return self
 
     def __repr__(self) -> str:
-        r_str = "%02X" % self.red
-        g_str = "%02X" % self.green
-        b_str = "%02X" % self.blue
-        return "#" + r_str + g_str + b_str
+        return self._string
 
     def __eq__(self, other) -> bool:
-        if other.__class__.__name__ == "DefaultColors":
+        if isinstance(other, DefaultColors):
             other = other.value
-        if self.red != other.red:
-            return False
-        if self.green != other.green:
-            return False
-        if self.blue != other.blue:
-            return False
-        return True
+        return self is other
+
+    def __hash__(self):
+        return self._hash
 
     @classmethod
     def from_string(cls, string: str):
@@ -0,0 +1,130 @@
+from copy import deepcopy
+
+from DIAL.Address import Address
+from DIAL.BinaryPayload import BinaryPayload
+from DIAL.Color import Color
+
+_immutable_types = (int, float, complex, bool, str, bytes, type(None), Address, Color, BinaryPayload)
+
+
+def _is_unchanged(value: any, original: any) -> bool:
+    if value is original:
+        return True
+    if type(value) is not type(original):
+        return False
+    try:
+        return bool(value == original)
+    except Exception:
+        return False
+
+
+def _has_aliased_values(*dicts: dict[any, any]) -> bool:
+    # True if a mutable object is the value of more than one key
+    seen: set[int] = set()
+    for values in dicts:
+        for value in dict.values(values):
+            if type(value) in _immutable_types:
+                continue
+            if id(value) in seen:
+                return True
+            seen.add(id(value))
+    return False
+
+
+class CopyOnWriteDict(dict):
+    # Starts out sharing all values with the dict it was created from. A mutable value is deep-copied
+    # the first time it is read or replaced, so changes never leak back into the original dict.
+    # Overriding __iter__ makes dict(d), {**d} and f(**d) read the values through __getitem__ as well.
+    _private_keys: set[any]
+    _memo: dict[int, any]
+
+    def __init__(self, shared: dict[any, any]):
+        super().__init__(shared)
+        self._private_keys = set()
+        self._memo = {}
+
+    def __reduce__(self):
+        return dict, (dict(dict.items(self)),)
+
+    def _own(self, key: any):
+        if key in self._private_keys or not dict.__contains__(self, key):
+            return
+        value = dict.__getitem__(self, key)
+        if type(value) not in _immutable_types:
+            # A shared memo keeps references between values of different keys intact
+            dict.__setitem__(self, key, deepcopy(value, self._memo))
+        self._private_keys.add(key)
+
+    def _own_all(self):
+        for key in list(dict.keys(self)):
+            self._own(key)
+
+    def __getitem__(self, key: any) -> any:
+        self._own(key)
+        return dict.__getitem__(self, key)
+
+    def __setitem__(self, key: any, value: any):
+        self._private_keys.add(key)
+        dict.__setitem__(self, key, value)
+
+    def get(self, key: any, default: any = None) -> any:
+        if key in self:
+            return self[key]
+        return default
+
+    def setdefault(self, key: any, default: any = None) -> any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key: any, *default) -> any:
+        self._own(key)
+        self._private_keys.discard(key)
+        return dict.pop(self, key, *default)
+
+    def popitem(self) -> tuple[any, any]:
+        if len(self) == 0:
+            raise KeyError("popitem(): dictionary is empty")
+        key = next(reversed(dict.keys(self)))
+        return key, self.pop(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other: dict[any, any]):
+        self.update(other)
+        return self
+
+    def __iter__(self):
+        return iter(dict.keys(self))
+
+    def keys(self):
+        # Keys are never copied, only the values are owned when they are read
+        return dict.keys(self)
+
+    def values(self):
+        self._own_all()
+        return dict.values(self)
+
+    def items(self):
+        self._own_all()
+        return dict.items(self)
+
+    def copy(self) -> dict[any, any]:
+        self._own_all()
+        return dict(dict.items(self))
+
+    def __copy__(self) -> dict[any, any]:
+        return self.copy()
+
+    def __or__(self, other: dict[any, any]) -> dict[any, any]:
+        result = self.copy()
+        result.update(other)
+        return result
+
+    def settle(self) -> dict[any, any]:
+        # Returns a plain dict. Values that were never read or written are still the ones of the original dict.
+        # Values that were accessed are kept even if they compare equal to the original ones, because an object
+        # with a custom __eq__ might have been changed in place.
+        return dict(dict.items(self))
@@ -0,0 +1,90 @@
+from enum import Enum
+
+import numpy
+
+from DIAL.Address import Address
+from DIAL.BinaryPayload import BinaryPayload
+from DIAL.Color import Color
+
+# Immutable payloads that can be shared between messages instead of being copied. Copying a frozen value
+# returns the value itself.
+
+_immutable_types = (int, float, complex, bool, str, bytes, type(None), Address, Color, BinaryPayload)
+
+
+def _frozen(self, *args, **kwargs):
+    raise RuntimeError("Cannot modify the data of a message with frozen payloads. The data is shared with other "
+                       "messages. Assign a new value instead, e.g. m.data = dict(m.data, key=value).")
+
+
+class FrozenDict(dict):
+    __setitem__ = _frozen
+    __delitem__ = _frozen
+    __ior__ = _frozen
+    pop = _frozen
+    popitem = _frozen
+    clear = _frozen
+    update = _frozen
+    setdefault = _frozen
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+    def __copy__(self) -> 'FrozenDict':
+        return self
+
+    def __deepcopy__(self, memo: dict[int, any]) -> 'FrozenDict':
+        return self
+
+
+class FrozenList(list):
+    __setitem__ = _frozen
+    __delitem__ = _frozen
+    __iadd__ = _frozen
+    __imul__ = _frozen
+    append = _frozen
+    extend = _frozen
+    insert = _frozen
+    pop = _frozen
+    remove = _frozen
+    clear = _frozen
+    sort = _frozen
+    reverse = _frozen
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+    def __copy__(self) -> 'FrozenList':
+        return self
+
+    def __deepcopy__(self, memo: dict[int, any]) -> 'FrozenList':
+        return self
+
+
+def is_frozen(value: any) -> bool:
+    return type(value) in (FrozenDict, FrozenList)
+
+
+def freeze(value: any) -> any:
+    # Returns an immutable version of the value. Values that are already frozen are returned without a copy.
+    value_type = type(value)
+    if value_type in _immutable_types or value_type is FrozenDict or value_type is FrozenList:
+        return value
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    if isinstance(value, tuple):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    if isinstance(value, (numpy.generic, Enum)):
+        return value
+    if isinstance(value, numpy.ndarray):
+        if not value.flags.writeable:
+            return value
+        array = value.copy()
+        array.flags.writeable = False
+        return array
+    raise TypeError(f"Frozen payloads can only contain dicts, lists, tuples, sets, numpy arrays and immutable values, "
+                    f"not '{value_type.__name__}'.")
@@ -1,23 +1,57 @@
 import copy
+import itertools
 import json
-import uuid
 from copy import deepcopy
 from uuid import UUID
 import textwrap
 from DIAL.Color import Color, DefaultColors
 from DIAL.Address import Address
+from DIAL.BinaryPayload import encode_binary_payloads, decode_binary_payloads
 from DIAL.Error import Error
 
+# Messages are numbered in the order they are created. Outside the simulator the IDs are rendered in the form of a
+# UUID (e.g. 00000000-0000-0000-0000-00000000002a), which is how they have always been represented.
+_message_ids: itertools.count = itertools.count(1)
+
+
+def new_message_id() -> int:
+    return next(_message_ids)
+
+
+def reserve_message_ids(message_id: int):
+    # New messages will only get IDs greater than message_id. Required when messages are loaded from somewhere else.
+    # IDs that do not fit into 64 bits (e.g. random UUIDs) are never reached by the counter.
+    global _message_ids
+    if message_id >= 2 ** 63:
+        return
+    _message_ids = itertools.count(max(next(_message_ids), message_id + 1))
+
+
+def message_id_to_string(message_id: int | None) -> str:
+    if message_id is None:
+        return "None"
+    return str(UUID(int=message_id))
+
+
+def message_id_from_string(message_id: str) -> int:
+    # Raises a ValueError for strings that are not in the form of a UUID
+    return UUID(message_id).int
+
+
 class Message:
+    __slots__ = ("title", "color", "target_address", "source_address", "data", "_id", "_parent_message",
+                 "_child_messages", "_is_lost", "_is_self_message", "_self_message_delay", "_arrival_time",
+                 "_arrival_theta", "_creation_time", "_creation_theta")
+
     title: str
     color: Color
     target_address: Address
     source_address: Address
     data: dict[str, any]
 
-    _id: UUID
-    _parent_message: UUID | None
-    _child_messages: list[UUID]
+    _id: int
+    _parent_message: int | None
+    _child_messages: list[int]
     _is_lost: bool
     _is_self_message: bool
     _self_message_delay: int
@@ -27,10 +61,10 @@ class Message:
     _creation_theta: int
 
     def __init__(self, target_address: Address | str, source_address: Address | str, title: str = None, color: Color | DefaultColors | None = None, data: dict[str, any] = None):
-        self._id = uuid.uuid4()
+        self._id = new_message_id()
 
         if title is None:
-            self.title = self._id.__str__()
+            self.title = message_id_to_string(self._id)
         else:
             self.title = title
 
@@ -77,12 +111,13 @@ class Message:
         elif type(color) == DefaultColors:
             color = color.value
 
+        # Addresses and colors are immutable and can be shared
         new_message: Message = Message(
-            target_address=deepcopy(target),
-            source_address=deepcopy(source)
+            target_address=target,
+            source_address=source,
+            title=self.title
         )
-        new_message.title = self.title
-        new_message.color = deepcopy(color)
+        new_message.color = color
         new_message.data = deepcopy(self.data)
         return new_message
 
@@ -95,9 +130,9 @@ class Message:
             "target": str(self.target_address),
             "color": str(color.__repr__()),
             "title": self.title,
-            "id": str(self._id),
-            "parent": str(self._parent_message),
-            "children": [str(child) for child in self._child_messages],
+            "id": message_id_to_string(self._id),
+            "parent": message_id_to_string(self._parent_message),
+            "children": [message_id_to_string(child) for child in self._child_messages],
             "arrival_time": int(self._arrival_time),
             "arrival_theta": int(self._arrival_theta),
             "creation_time": int(self._creation_time),
@@ -110,15 +145,15 @@ class Message:
 
     def to_json(self):
         json_representation = self.summary()
-        json_representation["data"] = self.data
+        json_representation["data"] = encode_binary_payloads(self.data)
 
         try:
-            json.dumps(self.data)
+            json.dumps(json_representation["data"])
         except TypeError as error:
             warning_message = f"""
             > Warning: '{error}'
             >
-            > The data attribute of the message with ID='{self._id}' might not look as expected.
+            > The data attribute of the message with ID='{message_id_to_string(self._id)}' might not look as expected.
             > If you want to send messages containing data formats that are not serializable to
             > JSON you must encode and decode it to some JSON serializable datatype yourself.
             > https://stackoverflow.com/questions/3768895/how-to-make-a-class-json-serializable
@@ -210,7 +245,7 @@ class MessageParser:
         if message._creation_time >= message._arrival_time:
             return Error("Violated constraint: message.creation_time < message.arrival_time")
         if message._parent_message is not None:
-            parent = self.simulator.get_message(str(message._parent_message))
+            parent = self.simulator.get_message(message._parent_message)
             if parent is not None:
                 if parent._arrival_time != message._creation_time or parent._arrival_theta != message._creation_theta:
                     return Error("Violated constraint: Message creation must be equal to parent arrival.")
@@ -218,7 +253,7 @@ class MessageParser:
         max_allowed_arrival_theta = 0
         if message._arrival_time in self.simulator.messages.keys():
             max_allowed_arrival_theta = len(self.simulator.messages[message._arrival_time]) + 1
-        original_message = self.simulator.get_message(str(message._id))
+        original_message = self.simulator.get_message(message._id)
         if original_message is not None:
             if original_message._arrival_time == message._arrival_time:
                 max_allowed_arrival_theta -= 1
@@ -247,9 +282,9 @@ class MessageParser:
             return Error(f"message.{key} is not a string")
         return json[key]
 
-    def parse_id(self, json: dict[str, any], key: str) -> uuid.UUID | None | Error:
+    def parse_id(self, json: dict[str, any], key: str) -> int | None | Error:
         if key == "id" and "id" not in json.keys() and self.generate_missing_id:
-            return uuid.uuid4()
+            return new_message_id()
         if key not in json.keys():
             return Error("Missing attribute message.id")
         if not isinstance(json[key], str):
@@ -258,9 +293,12 @@ class MessageParser:
         if id_str == "None" and key == "parent":
             return None
         try:
-            return uuid.UUID(id_str)
+            message_id = message_id_from_string(id_str)
         except:
             return Error(f"message.{key} contains a badly formed hexadecimal UUID string")
+        if key == "id":
+            reserve_message_ids(message_id)
+        return message_id
 
     def parse_address(self, json: dict[str, any], key: str) -> Address | Error:
         if key not in json.keys():
@@ -290,7 +328,7 @@ class MessageParser:
             return Error(f"message.{key} is not a bool")
         return json[key]
 
-    def parse_children(self, json: dict[str, any], key: str) -> list[uuid.UUID] | Error:
+    def parse_children(self, json: dict[str, any], key: str) -> list[int] | Error:
         if key not in json.keys():
             return Error(f"Missing attribute message.{key}")
         if not isinstance(json[key], list):
@@ -300,14 +338,14 @@ class MessageParser:
             return message_id
         if message_id is None:
             return Error(f"message.id should not be None")
-        message = self.simulator.get_message(str(message_id))
+        message = self.simulator.get_message(message_id)
         value = json[key]
         if message is None:
             if len(value) != 0:
                 return Error("A newly created message can not have children")
             else:
                 return []
-        if set(value) != set(message._child_messages):
+        if set(value) != set(message_id_to_string(child) for child in message._child_messages):
             return Error(f'Modifying message.{key} is not allowed.')
         return message._child_messages
 
@@ -317,4 +355,4 @@ class MessageParser:
         type_matches = isinstance(json[key], dict) and all(isinstance(x, str) for x in json[key].keys())
         if not type_matches:
             return Error(f"message.{key} must be of type dict[str, any]")
-        return json[key]
\ No newline at end of file
+        return decode_binary_payloads(json[key])
\ No newline at end of file
@@ -0,0 +1,488 @@
+import bisect
+import heapq
+from enum import Enum
+from typing import Iterable
+
+from DIAL.Message import Message
+
+
+class HeapTimeIndex:
+    # Two heaps split at a cursor: times <= cursor live in a max-heap, later times in a min-heap.
+    # Moving the cursor forward or backward only touches the times that are passed on the way.
+    _past: list[int]
+    _future: list[int]
+    _in_past: set[int]
+    _in_future: set[int]
+    _members: set[int]
+    _cursor: int | None
+
+    def __init__(self):
+        self._past = []
+        self._future = []
+        self._in_past = set()
+        self._in_future = set()
+        self._members = set()
+        self._cursor = None
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def add(self, time: int):
+        if time in self._members:
+            return
+        self._members.add(time)
+        if self._cursor is not None and time <= self._cursor:
+            if time not in self._in_past:
+                self._in_past.add(time)
+                heapq.heappush(self._past, -time)
+        else:
+            if time not in self._in_future:
+                self._in_future.add(time)
+                heapq.heappush(self._future, time)
+
+    def remove(self, time: int):
+        # Entries are deleted lazily when they reach the top of their heap
+        self._members.discard(time)
+
+    def _move_to(self, cursor: int | None):
+        while len(self._future) > 0 and cursor is not None and self._future[0] <= cursor:
+            time = heapq.heappop(self._future)
+            self._in_future.discard(time)
+            if time in self._members and time not in self._in_past:
+                self._in_past.add(time)
+                heapq.heappush(self._past, -time)
+        while len(self._past) > 0 and (cursor is None or -self._past[0] > cursor):
+            time = -heapq.heappop(self._past)
+            self._in_past.discard(time)
+            if time in self._members and time not in self._in_future:
+                self._in_future.add(time)
+                heapq.heappush(self._future, time)
+        self._cursor = cursor
+
+    def _clean(self, heap: list[int], side: set[int], sign: int):
+        while len(heap) > 0 and sign * heap[0] not in self._members:
+            side.discard(sign * heapq.heappop(heap))
+
+    def next_time(self, time: int | None) -> int | None:
+        self._move_to(time)
+        self._clean(self._future, self._in_future, 1)
+        if len(self._future) == 0:
+            return None
+        return self._future[0]
+
+    def previous_time(self, time: int) -> int | None:
+        self._move_to(time - 1)
+        self._clean(self._past, self._in_past, -1)
+        if len(self._past) == 0:
+            return None
+        return -self._past[0]
+
+    def times(self) -> list[int]:
+        return sorted(self._members)
+
+
+class SortedTimeIndex:
+    _times: list[int]
+
+    def __init__(self):
+        self._times = []
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    def add(self, time: int):
+        index = bisect.bisect_left(self._times, time)
+        if index < len(self._times) and self._times[index] == time:
+            return
+        self._times.insert(index, time)
+
+    def remove(self, time: int):
+        index = bisect.bisect_left(self._times, time)
+        if index < len(self._times) and self._times[index] == time:
+            del self._times[index]
+
+    def next_time(self, time: int | None) -> int | None:
+        index = 0
+        if time is not None:
+            index = bisect.bisect_right(self._times, time)
+        if index >= len(self._times):
+            return None
+        return self._times[index]
+
+    def previous_time(self, time: int) -> int | None:
+        index = bisect.bisect_left(self._times, time)
+        if index == 0:
+            return None
+        return self._times[index - 1]
+
+    def times(self) -> list[int]:
+        return list(self._times)
+
+
+class CalendarTimeIndex:
+    # Calendar queue (R. Brown, 1988): times are hashed into buckets of a fixed width that wrap around
+    # like the days of a year. When most delays are small the next time is found in the first few buckets.
+    _buckets: list[list[int]]
+    _width: int
+    _size: int
+    _minimum_bucket_count: int = 16
+
+    def __init__(self):
+        self._buckets = [[] for _ in range(self._minimum_bucket_count)]
+        self._width = 1
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _bucket(self, time: int) -> list[int]:
+        return self._buckets[(time // self._width) % len(self._buckets)]
+
+    def add(self, time: int):
+        bucket = self._bucket(time)
+        index = bisect.bisect_left(bucket, time)
+        if index < len(bucket) and bucket[index] == time:
+            return
+        bucket.insert(index, time)
+        self._size += 1
+        if self._size > 2 * len(self._buckets):
+            self._resize(2 * len(self._buckets))
+
+    def remove(self, time: int):
+        bucket = self._bucket(time)
+        index = bisect.bisect_left(bucket, time)
+        if index < len(bucket) and bucket[index] == time:
+            del bucket[index]
+            self._size -= 1
+            if self._size < len(self._buckets) // 2 and len(self._buckets) > self._minimum_bucket_count:
+                self._resize(len(self._buckets) // 2)
+
+    def _resize(self, bucket_count: int):
+        times = self.times()
+        # Bucket width is three times the average distance between the earliest times
+        sample = times[:25]
+        width = 1
+        if len(sample) > 1:
+            width = max(1, int(3 * (sample[-1] - sample[0]) / (len(sample) - 1)))
+        self._buckets = [[] for _ in range(bucket_count)]
+        self._width = width
+        for time in times:
+            self._bucket(time).append(time)
+
+    def next_time(self, time: int | None) -> int | None:
+        if self._size == 0:
+            return None
+        if time is None:
+            return min(bucket[0] for bucket in self._buckets if len(bucket) > 0)
+        start = time + 1
+        day_start = start - start % self._width
+        for day in range(len(self._buckets)):
+            lower = day_start + day * self._width
+            bucket = self._bucket(lower)
+            index = bisect.bisect_left(bucket, max(start, lower))
+            if index < len(bucket) and bucket[index] < lower + self._width:
+                return bucket[index]
+        # Nothing within one year: fall back to a direct search
+        result: int | None = None
+        for bucket in self._buckets:
+            index = bisect.bisect_left(bucket, start)
+            if index < len(bucket) and (result is None or bucket[index] < result):
+                result = bucket[index]
+        return result
+
+    def previous_time(self, time: int) -> int | None:
+        if self._size == 0:
+            return None
+        end = time - 1
+        day_start = end - end % self._width
+        for day in range(len(self._buckets)):
+            lower = day_start - day * self._width
+            bucket = self._bucket(lower)
+            index = bisect.bisect_right(bucket, min(end, lower + self._width - 1))
+            if index > 0 and bucket[index - 1] >= lower:
+                return bucket[index - 1]
+        result: int | None = None
+        for bucket in self._buckets:
+            index = bisect.bisect_right(bucket, end)
+            if index > 0 and (result is None or bucket[index - 1] > result):
+                result = bucket[index - 1]
+        return result
+
+    def times(self) -> list[int]:
+        return sorted(time for bucket in self._buckets for time in bucket)
+
+
+class QueueBackend(Enum):
+    HEAP = "HEAP"
+    SORTED = "SORTED"
+    CALENDAR = "CALENDAR"
+
+    def create_index(self):
+        if self == QueueBackend.HEAP:
+            return HeapTimeIndex()
+        if self == QueueBackend.CALENDAR:
+            return CalendarTimeIndex()
+        return SortedTimeIndex()
+
+
+class MessageQueue(dict):
+    # Behaves like the plain dict[int, list[Message]] that maps a time to the messages arriving at that time
+    # (the position within the list is theta), but keeps an index over the times so that neighbouring
+    # times can be looked up without sorting all keys, and an index over the message IDs.
+    # Messages should be added and removed through insert() and remove() to keep all indices consistent.
+    #
+    # The queue also knows the position of the simulator (the cursor). For every edge it keeps the messages
+    # after the cursor in the order in which iterating over the queue visits them: time slots in the order
+    # they were created, then by theta. This is the order in which the FIFO scheduler looks for earlier messages.
+    backend: QueueBackend
+    cursor: tuple[int, int] | None
+
+    def __init__(self, messages: dict[int, list[Message]] | None = None, backend: QueueBackend = QueueBackend.SORTED,
+                 cursor: tuple[int, int] | None = None):
+        super().__init__()
+        self.backend = backend
+        # Setting the cursor first keeps the messages before it out of the per-edge index
+        self.cursor = cursor
+        self._index = backend.create_index()
+        self._messages_by_id: dict[int, Message] = {}
+        self._slot_order: dict[int, int] = {}
+        self._slot_count = 0
+        self._pending_by_edge: dict[tuple[str, str], list[Message]] = {}
+        self._pending_by_target: dict[str, int] = {}
+        self._edge_of_pending: dict[int, tuple[str, str]] = {}
+        # Heaps of all times that ever had a slot. Times without a slot are removed once they reach the top.
+        self._earliest_times: list[int] = []
+        self._latest_times: list[int] = []
+        if messages is not None:
+            for time in messages.keys():
+                self[time] = messages[time]
+
+    def __reduce__(self):
+        return self.__class__, (dict(self), self.backend, self.cursor)
+
+    def __setitem__(self, time: int, messages: list[Message]):
+        if time not in self:
+            self._index.add(time)
+            self._slot_order[time] = self._slot_count
+            self._slot_count += 1
+            heapq.heappush(self._earliest_times, time)
+            heapq.heappush(self._latest_times, -time)
+        else:
+            self._forget_messages(super().__getitem__(time))
+        super().__setitem__(time, messages)
+        for theta, message in enumerate(messages):
+            message._arrival_time = time
+            message._arrival_theta = theta
+            self._messages_by_id[message._id] = message
+            if self._is_after_cursor(time, theta):
+                self._add_pending(message)
+
+    def __delitem__(self, time: int):
+        self._forget_messages(super().__getitem__(time))
+        super().__delitem__(time)
+        self._index.remove(time)
+        del self._slot_order[time]
+
+    def _forget_messages(self, messages: list[Message]):
+        for message in messages:
+            if self._messages_by_id.get(message._id) is message:
+                del self._messages_by_id[message._id]
+            self._remove_pending(message)
+
+    def pop(self, time: int, *default):
+        if time in self:
+            self._index.remove(time)
+            self._forget_messages(super().__getitem__(time))
+            del self._slot_order[time]
+        return super().pop(time, *default)
+
+    def popitem(self):
+        time, messages = super().popitem()
+        self._index.remove(time)
+        self._forget_messages(messages)
+        del self._slot_order[time]
+        return time, messages
+
+    def setdefault(self, time: int, default: list[Message] | None = None):
+        if time not in self:
+            self[time] = default
+        return self[time]
+
+    def update(self, *args, **kwargs):
+        for time, messages in dict(*args, **kwargs).items():
+            self[time] = messages
+
+    def clear(self):
+        super().clear()
+        self._index = self.backend.create_index()
+        self._messages_by_id = {}
+        self._slot_order = {}
+        self._pending_by_edge = {}
+        self._pending_by_target = {}
+        self._edge_of_pending = {}
+        self._earliest_times = []
+        self._latest_times = []
+
+    def insert(self, message: Message, time: int, theta: int | None = None):
+        # Places the message at (time, theta) and shifts the theta of all later messages at that time.
+        # Without a theta the message is appended to the end of the time slot.
+        if time not in self:
+            self[time] = []
+        messages = super().__getitem__(time)
+        if theta is None:
+            theta = len(messages)
+        messages.insert(theta, message)
+        message._arrival_time = time
+        message._arrival_theta = theta
+        for index in range(theta + 1, len(messages)):
+            messages[index]._arrival_theta = index
+        self._messages_by_id[message._id] = message
+        if self._is_after_cursor(time, theta):
+            self._add_pending(message)
+
+    def remove(self, message: Message):
+        time = message._arrival_time
+        messages = super().__getitem__(time)
+        theta = message._arrival_theta
+        if theta >= len(messages) or messages[theta] is not message:
+            theta = messages.index(message)
+            message._arrival_theta = theta
+        self._remove_pending(message)
+        del messages[theta]
+        for index in range(theta, len(messages)):
+            messages[index]._arrival_theta = index
+        if self._messages_by_id.get(message._id) is message:
+            del self._messages_by_id[message._id]
+        if len(messages) == 0:
+            del self[time]
+
+    def get_message(self, message_id: int) -> Message | None:
+        return self._messages_by_id.get(message_id)
+
+    def message_ids(self) -> Iterable[int]:
+        return self._messages_by_id.keys()
+
+    def message_count(self) -> int:
+        return len(self._messages_by_id)
+
+    def times(self) -> list[int]:
+        return self._index.times()
+
+    def first_time(self) -> int | None:
+        return self.next_time(None)
+
+    def next_time(self, time: int | None) -> int | None:
+        # Earliest time after the given time (or overall) that has at least one message
+        next_time = self._index.next_time(time)
+        while next_time is not None and len(self[next_time]) == 0:
+            next_time = self._index.next_time(next_time)
+        return next_time
+
+    def previous_time(self, time: int) -> int | None:
+        # Latest time before the given time that has at least one message
+        previous_time = self._index.previous_time(time)
+        while previous_time is not None and len(self[previous_time]) == 0:
+            previous_time = self._index.previous_time(previous_time)
+        return previous_time
+
+    def set_cursor(self, time: int | None, theta: int | None):
+        # Moves the cursor to the given position. The messages that are passed on the way are moved out of
+        # or back into the per-edge index, so a single step only touches a single message.
+        new_cursor = None if time is None else (time, theta)
+        old_cursor = self.cursor
+        if new_cursor == old_cursor:
+            return
+        if old_cursor is None or (new_cursor is not None and new_cursor > old_cursor):
+            passed = list(self._messages_between(old_cursor, new_cursor))
+            self.cursor = new_cursor
+            for message in passed:
+                self._remove_pending(message)
+        else:
+            passed = list(self._messages_between(new_cursor, old_cursor))
+            self.cursor = new_cursor
+            for message in passed:
+                self._add_pending(message)
+
+    def refresh(self, message: Message):
+        # Must be called after the source or target of a queued message was changed
+        if self._remove_pending(message):
+            self._add_pending(message)
+
+    def min_time(self) -> int | None:
+        # Earliest time that has a slot, same as min(self.keys())
+        while len(self._earliest_times) > 0 and self._earliest_times[0] not in self:
+            heapq.heappop(self._earliest_times)
+        if len(self._earliest_times) == 0:
+            return None
+        return self._earliest_times[0]
+
+    def max_time(self) -> int | None:
+        # Latest time that has a slot, same as max(self.keys())
+        while len(self._latest_times) > 0 and -self._latest_times[0] not in self:
+            heapq.heappop(self._latest_times)
+        if len(self._latest_times) == 0:
+            return None
+        return -self._latest_times[0]
+
+    def slot_size(self, time: int) -> int:
+        if time not in self:
+            return 0
+        return len(super().__getitem__(time))
+
+    def backlog(self, target: str) -> int:
+        # Number of messages after the cursor that are sent to the target node
+        return self._pending_by_target.get(target, 0)
+
+    def latest_arrival(self, source: str, target: str) -> int | None:
+        # Arrival time of the last message from source to target after the cursor in iteration order
+        pending = self._pending_by_edge.get((source, target))
+        if not pending:
+            return None
+        return pending[-1]._arrival_time
+
+    def _is_after_cursor(self, time: int, theta: int) -> bool:
+        return self.cursor is None or (time, theta) > self.cursor
+
+    def _messages_between(self, start: tuple[int, int] | None, end: tuple[int, int]):
+        # All messages after start up to and including end
+        time = self.first_time() if start is None else start[0]
+        while time is not None and time <= end[0]:
+            messages = super().__getitem__(time)
+            first = start[1] + 1 if start is not None and time == start[0] else 0
+            last = end[1] + 1 if time == end[0] else len(messages)
+            for theta in range(first, min(last, len(messages))):
+                yield messages[theta]
+            time = self.next_time(time)
+
+    def _iteration_key(self, message: Message) -> tuple[int, int]:
+        return self._slot_order[message._arrival_time], message._arrival_theta
+
+    def _add_pending(self, message: Message):
+        edge = (message.source_address.node_name, message.target_address.node_name)
+        pending = self._pending_by_edge.setdefault(edge, [])
+        # Messages are usually appended to the last time slot, so this normally inserts at the end
+        if len(pending) == 0 or self._iteration_key(pending[-1]) < self._iteration_key(message):
+            pending.append(message)
+        else:
+            pending.insert(bisect.bisect_left(pending, self._iteration_key(message), key=self._iteration_key), message)
+        self._edge_of_pending[message._id] = edge
+        self._pending_by_target[edge[1]] = self._pending_by_target.get(edge[1], 0) + 1
+
+    def _remove_pending(self, message: Message) -> bool:
+        edge = self._edge_of_pending.pop(message._id, None)
+        if edge is None:
+            return False
+        pending = self._pending_by_edge[edge]
+        if pending[-1] is message:
+            pending.pop()
+        else:
+            index = bisect.bisect_left(pending, self._iteration_key(message), key=self._iteration_key)
+            if index >= len(pending) or pending[index] is not message:
+                index = pending.index(message)
+            del pending[index]
+        if len(pending) == 0:
+            del self._pending_by_edge[edge]
+        self._pending_by_target[edge[1]] -= 1
+        if self._pending_by_target[edge[1]] == 0:
+            del self._pending_by_target[edge[1]]
+        return True
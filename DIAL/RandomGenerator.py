@@ -0,0 +1,85 @@
+import numpy
+
+
+def pack_random_state(generator: numpy.random.Generator) -> int | dict[str, any]:
+    state = generator.bit_generator.state
+    if state["bit_generator"] != "PCG64":
+        return state
+    # The increment of PCG64 never changes, so the 128 bit state, the 32 bit buffer and its flag fit into one integer
+    return state["state"]["state"] | (state["uinteger"] << 128) | (state["has_uint32"] << 160)
+
+
+def restore_random_state(generator: numpy.random.Generator, packed_state: int | dict[str, any]):
+    if isinstance(packed_state, dict):
+        generator.bit_generator.state = packed_state
+        return
+    state = generator.bit_generator.state
+    state["state"]["state"] = packed_state & ((1 << 128) - 1)
+    state["uinteger"] = (packed_state >> 128) & 0xFFFFFFFF
+    state["has_uint32"] = packed_state >> 160
+    generator.bit_generator.state = state
+
+
+class TrackedRandomGenerator:
+    # Stands in for a numpy Generator and remembers the state the generator had before it was used for the
+    # first time since the last call to track(). Steps that do not draw random numbers need no stored state.
+    generator: numpy.random.Generator
+    state_before_use: int | dict[str, any] | None
+
+    def __init__(self, generator: numpy.random.Generator):
+        self.track(generator)
+
+    def track(self, generator: numpy.random.Generator):
+        self.generator = generator
+        self.state_before_use = None
+
+    def __getattr__(self, name: str) -> any:
+        # Only called for attributes of the wrapped generator. Special attributes are looked up by copy and pickle
+        # before the instance is initialized.
+        if name.startswith("__") or "generator" not in self.__dict__:
+            raise AttributeError(name)
+        if self.state_before_use is None:
+            self.state_before_use = pack_random_state(self.generator)
+        return getattr(self.generator, name)
+
+
+class RandomBatch:
+    # Serves random() and integers() from numbers that are drawn from the generator in a single call.
+    # The n-th call within a batch uses the n-th number of the batch, so the results are just as reproducible
+    # as drawing one number per call. Unused numbers are discarded when the batch ends.
+    generator: any
+    batch_size: int
+    _values: list[float]
+    _position: int
+
+    def __init__(self, generator: any, batch_size: int):
+        self.generator = generator
+        self.batch_size = max(batch_size, 1)
+        self._values = []
+        self._position = 0
+
+    def _next(self) -> float:
+        if self._position == len(self._values):
+            self._values = self.generator.random(self.batch_size).tolist()
+            self._position = 0
+        value = self._values[self._position]
+        self._position += 1
+        return value
+
+    def random(self, size: any = None, **kwargs) -> float:
+        if size is not None or len(kwargs) > 0:
+            return self.generator.random(size, **kwargs)
+        return self._next()
+
+    def integers(self, low: int, high: int | None = None, size: any = None, **kwargs) -> int:
+        if size is not None or len(kwargs) > 0:
+            return self.generator.integers(low, high, size, **kwargs)
+        if high is None:
+            low, high = 0, low
+        return int(low) + int(self._next() * (int(high) - int(low)))
+
+    def __getattr__(self, name: str) -> any:
+        # Everything else is drawn from the generator directly
+        if name.startswith("__") or "generator" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.generator, name)
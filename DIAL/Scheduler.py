@@ -1,6 +1,7 @@
 from enum import Enum
 from typing import Tuple, Callable
 from DIAL.Message import Message
+from DIAL.MessageQueue import MessageQueue
 import numpy
 
 
@@ -11,6 +12,69 @@ Scheduler = Callable[
 ] # (Topology, time, theta, messageQueue, message, RNG) -> (time)
 
 
+class QueueView:
+    # Read-only access to the message queue for incremental schedulers. All queries take O(1) or O(log n).
+    _queue: MessageQueue
+
+    def __init__(self, message_queue: MessageQueue):
+        self._queue = message_queue
+
+    @property
+    def time(self) -> int | None:
+        # Position of the simulator, None before the first step
+        return None if self._queue.cursor is None else self._queue.cursor[0]
+
+    @property
+    def theta(self) -> int | None:
+        return None if self._queue.cursor is None else self._queue.cursor[1]
+
+    def min_time(self) -> int | None:
+        return self._queue.min_time()
+
+    def max_time(self) -> int | None:
+        return self._queue.max_time()
+
+    def slot_size(self, time: int) -> int:
+        return self._queue.slot_size(time)
+
+    def message_count(self) -> int:
+        return self._queue.message_count()
+
+    def last_arrival(self, source: str, target: str) -> int | None:
+        # Arrival time of the message from source to target that the FIFO scheduler has to wait for
+        return self._queue.latest_arrival(source, target)
+
+    def backlog(self, target: str) -> int:
+        # Number of messages to the target node that have not been processed yet
+        return self._queue.backlog(target)
+
+
+IncrementalScheduler = Callable[
+    [any, QueueView, Message, numpy.random.Generator],
+    int
+] # (Topology, queueView, message, RNG) -> (time)
+
+
+def incremental_scheduler(scheduler: IncrementalScheduler) -> IncrementalScheduler:
+    # Marks a function as IncrementalScheduler so that it can be used in an EdgeConfig
+    scheduler.is_incremental_scheduler = True
+    return scheduler
+
+
+def as_incremental_scheduler(scheduler: Scheduler | IncrementalScheduler) -> IncrementalScheduler:
+    # Adapter that lets schedulers with the original signature be called like an IncrementalScheduler
+    if getattr(scheduler, "is_incremental_scheduler", False):
+        return scheduler
+
+    @incremental_scheduler
+    def adapter(topology: any, queue_view: QueueView, message: Message,
+                random_number_generator: numpy.random.Generator) -> int:
+        return scheduler(topology, queue_view.time, queue_view.theta, queue_view._queue, message,
+                         random_number_generator)
+
+    return adapter
+
+
 def local_fifo_scheduler(
         topology: any,
         time: int,
@@ -27,15 +91,21 @@ def local_fifo_scheduler(
         min_valid_time = time + 1
     else:
         return 0
-    for time_index in message_queue.keys():
-        if time_index < time:
-            continue
-        for theta_index in range(0, len(message_queue[time_index])):
-            if time_index == time and theta_index <= theta:
+    if isinstance(message_queue, MessageQueue) and message_queue.cursor == (time, theta):
+        # The queue keeps the messages after the current position per edge, in the same order as the loop below
+        latest_arrival = message_queue.latest_arrival(message.source_address.node_name, message.target_address.node_name)
+        if latest_arrival is not None:
+            min_valid_time = latest_arrival + 1
+    else:
+        for time_index in message_queue.keys():
+            if time_index < time:
                 continue
-            selected_message = message_queue[time_index][theta_index]
-            if selected_message.source_address.node_name == message.source_address.node_name and selected_message.target_address.node_name == message.target_address.node_name:
-                min_valid_time = time_index + 1
+            for theta_index in range(0, len(message_queue[time_index])):
+                if time_index == time and theta_index <= theta:
+                    continue
+                selected_message = message_queue[time_index][theta_index]
+                if selected_message.source_address.node_name == message.source_address.node_name and selected_message.target_address.node_name == message.target_address.node_name:
+                    min_valid_time = time_index + 1
     insert_time = random_number_generator.integers(min_valid_time, min_valid_time + 10)
     return insert_time
 
@@ -50,6 +120,8 @@ def global_fifo_scheduler(
     if topology.__class__.__name__ != "Topology":
         print("Argument of topology must be of type 'Topology'")
         exit(1)
+    if isinstance(message_queue, MessageQueue):
+        return message_queue.max_time() + 1
     return max(message_queue.keys()) + 1
 
 def random_scheduler(
@@ -1,16 +1,26 @@
+import bisect
 import copy
 import textwrap
 import types
 from copy import deepcopy
+from enum import Enum
 from typing import Callable, Tuple
+from uuid import UUID
 
 import numpy.random
 
 from DIAL.Address import Address
 from DIAL.Color import DefaultColors, Color
-from DIAL.Message import Message
+from DIAL.BinaryPayload import BinaryPayload
+from DIAL.FrozenData import freeze, is_frozen
+from DIAL.Message import Message, message_id_from_string, message_id_to_string, reserve_message_ids
+from DIAL.MessageQueue import MessageQueue, QueueBackend
+from DIAL.RandomGenerator import TrackedRandomGenerator, RandomBatch, restore_random_state
+from DIAL.Scheduler import QueueView, IncrementalScheduler, Scheduler, as_incremental_scheduler
 from DIAL.State import State
+from DIAL.StateHistory import StateHistory
 from DIAL.Topology import Topology, EdgeConfig, DefaultTopologies
+from DIAL.TraceStore import TraceStore
 from DIAL.ReadOnlyDict import ReadOnlyDict
 
 Algorithm = Callable[[State, Message], None]
@@ -36,32 +46,156 @@ def get_local_states() -> ReadOnlyDict[Address, State]:
 
 
 
+class JournalEntry:
+    # Records what a single call to step_forward changed so that step_backward can undo exactly that
+    time: int
+    theta: int
+    message_id: int
+    child_ids: list[int]
+    address: Address
+    random_state: int | dict[str, any] | None  # State of the simulators RNG before the step if it was used
+    created_state: bool  # The state of the address was created by the step
+
+    def __init__(self, time: int, theta: int, message_id: int, child_ids: list[int], address: Address,
+                 random_state: int | dict[str, any] | None, created_state: bool):
+        self.time = time
+        self.theta = theta
+        self.message_id = message_id
+        self.child_ids = child_ids
+        self.address = address
+        self.random_state = random_state
+        self.created_state = created_state
+
+
+class StopReason(Enum):
+    QUIESCENCE = "quiescence"  # No messages are left to process
+    MAX_STEPS = "max_steps"
+    MAX_TIME = "max_time"
+    PREDICATE = "predicate"
+
+
+class RunResult:
+    # Compact result of Simulator.run
+    stop_reason: StopReason | None
+    steps: int
+    time: int | None
+    theta: int | None
+    sent_messages: int
+    lost_messages: int
+
+    def __init__(self):
+        self.stop_reason = None
+        self.steps = 0
+        self.time = None
+        self.theta = None
+        self.sent_messages = 0
+        self.lost_messages = 0
+
+    def __repr__(self) -> str:
+        return (f"RunResult(stop_reason={self.stop_reason}, steps={self.steps}, time={self.time}/{self.theta}, "
+                f"sent_messages={self.sent_messages}, lost_messages={self.lost_messages})")
+
+
+class SeekResult:
+    # Compact result of Simulator.seek
+    time: int | None
+    theta: int | None
+    steps: int  # Executed steps are counted positive, undone steps negative
+    changed_addresses: list[Address]  # Addresses of the states that were changed, created or removed
+    reached: bool  # False if the target lies before the oldest step that can be undone
+
+    def __init__(self):
+        self.time = None
+        self.theta = None
+        self.steps = 0
+        self.changed_addresses = []
+        self.reached = True
+
+    def __repr__(self) -> str:
+        return (f"SeekResult(time={self.time}/{self.theta}, steps={self.steps}, "
+                f"changed_states={len(self.changed_addresses)}, reached={self.reached})")
+
+
+class ExecutionContext:
+    # Per-step inputs of the functions that are available to algorithms. The compiled algorithms only hold a
+    # reference to this object, so updating its attributes before a step is all that is needed.
+    time: int | None
+    sent_messages: list[Message]
+    states: dict[Address, list[State] | StateHistory]
+    local_addresses: list[Address]
+
+    def __init__(self):
+        self.time = None
+        self.sent_messages = []
+        self.states = {}
+        self.local_addresses = []
+
+    def send(self, message: Message):
+        self.sent_messages.append(message)
+
+    def send_to_self(self, message: Message, delay: int):
+        message._is_self_message = True
+        message._self_message_delay = delay
+        self.sent_messages.append(message)
+
+    def get_global_time(self) -> int:
+        return self.time
+
+    def get_local_states(self) -> ReadOnlyDict[Address, State]:
+        # The states are only copied when an algorithm asks for them. During a step the latest versions
+        # do not change, because the algorithm works on a new version that is appended afterwards.
+        # Every call gets copies of its own, so changes to them are not visible to later calls.
+        local_states = {address: self.states[address][-1] for address in self.local_addresses}
+        return ReadOnlyDict(copy.deepcopy(local_states))
+
+
 class Simulator:
     time: int | None
     theta: int | None
 
-    messages: dict[int, list[Message]]
-    states: dict[Address, list[State]]
+    messages: MessageQueue
+    states: dict[Address, list[State] | StateHistory]
+    addresses_by_node: dict[str, list[Address]]
     node_colors: dict[Tuple[int | None, int | None], dict[Address, Color]]
     node_neighbors: dict[Tuple[int | None, int | None], dict[Address, list[str]]]
-
-    last_send_messages: list[Message] = []
+    journal: list[JournalEntry]
+    trace: TraceStore
+    trace_writer: any  # TraceWriter that streams every step to a file
+    checkpoint_interval: int | None
 
     topology: Topology
     algorithms: dict[str, Algorithm]
     condition_hooks: list[ConditionHook]
 
-    random_number_generator_states: list[any]
+    context: ExecutionContext
+    _scope: dict[str, any]
+    _compiled_algorithms: dict[str, Tuple[Algorithm, types.FunctionType]]
+    _compiled_hooks: list[Tuple[ConditionHook, types.FunctionType]]
+    _incremental_schedulers: dict[Scheduler | IncrementalScheduler, IncrementalScheduler]
+    _queue_view: QueueView | None
+
     random_generator: numpy.random.Generator
+    tracked_random_generator: TrackedRandomGenerator
+    batch_random_draws: bool
+    frozen_payloads: bool
+    _random_batch: RandomBatch | None
 
     def __init__(self, topology: Topology | DefaultTopologies, algorithms: dict[str, Algorithm],
                  initial_messages: dict[int, list[Message]],
                  seed=0,
-                 condition_hooks: list[ConditionHook] = []):
+                 condition_hooks: list[ConditionHook] = [],
+                 queue_backend: QueueBackend = QueueBackend.SORTED,
+                 checkpoint_interval: int | None = None,
+                 batch_random_draws: bool = False,
+                 frozen_payloads: bool = False):
 
         # Setup RNG
         self.random_generator = numpy.random.default_rng(seed)
-        self.random_number_generator_states = [self.random_generator.__getstate__()]
+        self.tracked_random_generator = TrackedRandomGenerator(self.random_generator)
+        # With batched draws the loss and scheduling of all messages sent in one step use numbers that are drawn
+        # in a single call. This changes the outcome of a simulation compared to unbatched draws with the same seed.
+        self.batch_random_draws = batch_random_draws
+        self._random_batch = None
 
         # Store static information of the simulation environment
         if isinstance(topology, DefaultTopologies):
@@ -75,7 +209,8 @@ class Simulator:
         if len(initial_messages.keys()) == 0:
             print("Error: No initial messages supplied!")
             exit(1)
-        self.messages = initial_messages
+        self.messages = MessageQueue(initial_messages, backend=queue_backend)
+        self._queue_view = None
         for t in self.messages.keys():
             for message in self.messages[t]:
                 if message.target_address.algorithm not in self.algorithms.keys():
@@ -92,22 +227,101 @@ class Simulator:
                 msg._arrival_time = t
                 n += 1
         self.states = {}
+        self.addresses_by_node = {}
         self.node_colors = {}
         self.node_neighbors = {}
+        self.journal = []
+        self.trace = TraceStore()
+        self.trace_writer = None
+        # Without an interval every version of a state is kept as a State object. With an interval the
+        # history of a state is delta encoded and only every n-th version is kept as a full snapshot.
+        if checkpoint_interval is not None and checkpoint_interval < 1:
+            print("Error: checkpoint_interval must be at least 1!")
+            exit(1)
+        self.checkpoint_interval = checkpoint_interval
+        # With frozen payloads the data of a message is made immutable once and then shared by every copy
+        # of the message instead of being deep-copied whenever a message is delivered, copied or sent.
+        self.frozen_payloads = frozen_payloads
+
+        # Setup the scope in which algorithms and hooks are executed
+        self.context = ExecutionContext()
+        self._compile_scope()
+        self._incremental_schedulers = {}
+
+    def __getstate__(self) -> dict[str, any]:
+        # Compiled functions are not copied by deepcopy and would keep referring to the context of this object
+        state = self.__dict__.copy()
+        del state["_scope"]
+        del state["_compiled_algorithms"]
+        del state["_compiled_hooks"]
+        del state["_incremental_schedulers"]
+        # An open file can not be copied. The copy is not recorded.
+        state["trace_writer"] = None
+        return state
+
+    def __setstate__(self, state: dict[str, any]):
+        self.__dict__.update(state)
+        # Messages created from now on must not reuse the IDs of the loaded ones
+        reserve_message_ids(max(self.messages.message_ids(), default=0))
+        self._compile_scope()
+        self._incremental_schedulers = {}
+
+    def _compile_scope(self):
+        scope: dict[str, any] = {
+            "DefaultColors": DefaultColors,
+            "Color": Color,
+            "Message": Message,
+            "Address": Address,
+            "BinaryPayload": BinaryPayload,
+            "send": self.context.send,
+            "send_to_self": self.context.send_to_self,
+            "get_global_time": self.context.get_global_time,
+            "get_local_states": self.context.get_local_states
+        }
+        self._scope = dict(scope, **__builtins__)
+        self._compiled_algorithms = {}
+        self._compiled_hooks = []
+
+    def _compile(self, function: Algorithm | ConditionHook) -> types.FunctionType:
+        return types.FunctionType(function.__code__, dict(self._scope))
+
+    def _get_compiled_algorithm(self, name: str) -> types.FunctionType:
+        algorithm = self.algorithms[name]
+        compiled = self._compiled_algorithms.get(name)
+        if compiled is None or compiled[0] is not algorithm:
+            compiled = (algorithm, self._compile(algorithm))
+            self._compiled_algorithms[name] = compiled
+        return compiled[1]
+
+    def _get_compiled_hooks(self) -> list[types.FunctionType]:
+        if (len(self._compiled_hooks) != len(self.condition_hooks)
+                or any(compiled[0] is not hook for compiled, hook in zip(self._compiled_hooks, self.condition_hooks))):
+            self._compiled_hooks = [(hook, self._compile(hook)) for hook in self.condition_hooks]
+        return [compiled[1] for compiled in self._compiled_hooks]
+
+    def _call_compiled(self, function: types.FunctionType, *args):
+        try:
+            function(*args)
+        finally:
+            # Globals defined or reassigned by the function must not persist into the next step
+            function.__globals__.clear()
+            function.__globals__.update(self._scope)
+
+    @property
+    def queue_view(self) -> QueueView:
+        if self._queue_view is None or self._queue_view._queue is not self.messages:
+            self._queue_view = QueueView(self.messages)
+        return self._queue_view
 
     def send(self, message: Message):
-        self.last_send_messages.append(message)
+        self.context.send(message)
 
     def send_to_self(self, message: Message, delay: int):
-        message._is_self_message = True
-        message._self_message_delay = delay
-        self.last_send_messages.append(message)
+        self.context.send_to_self(message, delay)
 
     def find_first(self) -> Tuple[int, int] | None:
-        if len(self.messages.keys()) == 0:
-            return None
-        t = min(self.messages.keys())
-        if len(self.messages[t]) == 0:
+        t = self.messages.first_time()
+        if t is None:
             return None
         return t, 0
 
@@ -116,18 +330,18 @@ class Simulator:
             return self.find_first()
         if self.theta + 1 < len(self.messages[self.time]):
             return self.time, self.theta + 1
-        for t in sorted(self.messages.keys()):
-            if t > self.time and len(self.messages[t]) > 0:
-                return t, 0
-        return None
+        t = self.messages.next_time(self.time)
+        if t is None:
+            return None
+        return t, 0
 
     def find_previous(self) -> Tuple[int, int] | None:
         if self.theta > 0:
             return self.time, self.theta - 1
-        for t in sorted(self.messages.keys(), reverse=True):
-            if t < self.time and len(self.messages[t]) > 0:
-                return t, len(self.messages[t]) - 1
-        return None
+        t = self.messages.previous_time(self.time)
+        if t is None:
+            return None
+        return t, len(self.messages[t]) - 1
 
     def insert_message_to_queue(self, message: Message, time: int | None = None, theta: int | None = None,
                                 is_lost: bool | None = None) -> bool:
@@ -139,7 +353,7 @@ class Simulator:
                 f'No edge exists between {message.source_address.node_name} and {message.target_address.node_name}. Can not send message.')
             return False
         if is_lost is None:
-            message._is_lost = self.random_generator.random() > edge_config.reliability
+            message._is_lost = self._message_random_generator().random() > edge_config.reliability
         else:
             message._is_lost = is_lost
 
@@ -148,29 +362,61 @@ class Simulator:
             exit(1)
 
         # Determine position in the queue
-        scheduler = edge_config.scheduler
         insert_time = time
         if time is None:
-            insert_time = scheduler(self.topology, self.time, self.theta, self.messages, message, self.random_generator)
-        if insert_time not in self.messages.keys():
-            self.messages[insert_time] = []
+            scheduler = self._incremental_schedulers.get(edge_config.scheduler)
+            if scheduler is None:
+                scheduler = as_incremental_scheduler(edge_config.scheduler)
+                self._incremental_schedulers[edge_config.scheduler] = scheduler
+            insert_time = scheduler(self.topology, self.queue_view, message, self._message_random_generator())
         message._arrival_time = insert_time
 
-        insert_theta = len(self.messages[insert_time])
+        insert_theta = 0
+        if insert_time in self.messages.keys():
+            insert_theta = len(self.messages[insert_time])
         if theta is not None:
             if insert_theta != theta:
                 return False
-        message._arrival_theta = insert_theta
-        self.messages[insert_time].append(message)
+        self.messages.insert(message, insert_time)
         return True
 
-    def get_message(self, message_id: str | None) -> Message | None:
+    def _share_payload(self, message: Message) -> Message:
+        # Addresses and colors are immutable, so only the message itself has to be copied
+        shared_message = copy.copy(message)
+        shared_message.data = freeze(message.data)
+        shared_message._child_messages = []
+        return shared_message
+
+    def _message_random_generator(self) -> TrackedRandomGenerator | RandomBatch:
+        if self._random_batch is not None:
+            return self._random_batch
+        return self.tracked_random_generator
+
+    def get_message(self, message_id: int | UUID | str | None) -> Message | None:
         if message_id is None:
             return None
-        for t in self.messages.keys():
-            for msg in self.messages[t]:
-                if str(msg._id) == str(message_id):
-                    return msg
+        if isinstance(message_id, UUID):
+            message_id = message_id.int
+        elif not isinstance(message_id, int):
+            try:
+                message_id = message_id_from_string(str(message_id))
+            except ValueError:
+                return None
+        return self.messages.get_message(message_id)
+
+    def trace_arrays(self) -> dict[str, numpy.ndarray]:
+        # One entry per received message in the order they were received. Source and target are indices into
+        # topology.nodes. See TraceStore for all columns.
+        return self.trace.arrays()
+
+    def find_latest_step(self, address: Address) -> Tuple[int, int] | None:
+        for journal_entry in reversed(self.journal):
+            if journal_entry.address == address:
+                return journal_entry.time, journal_entry.theta
+        # States restored from a snapshot have no journal entries, but their latest transition is known
+        for time_tuple in reversed(self.node_colors.keys()):
+            if address in self.node_colors[time_tuple]:
+                return time_tuple
         return None
 
     def insert_self_message_to_queue(self, message: Message):
@@ -184,26 +430,21 @@ class Simulator:
         if current_time is None:
             current_time = self.find_first()[0]
         insert_time = current_time + message._self_message_delay
-        message._arrival_time = insert_time
-        if insert_time not in self.messages.keys():
-            self.messages[insert_time] = []
-        message._arrival_theta = len(self.messages[insert_time])
-        self.messages[insert_time].append(message)
+        self.messages.insert(message, insert_time)
 
-    def step_forward(self, verbose=False) -> dict[str, any] | None:
+    def _execute_step(self, new_position: Tuple[int, int]) -> Tuple[Message, State, State, list[Message]]:
         # Advance time
-        new_position = self.find_next()
-        if new_position is None:
-            return None
         self.time = new_position[0]
         self.theta = new_position[1]
+        self.messages.set_cursor(self.time, self.theta)
+        self.tracked_random_generator.track(self.random_generator)
         # Find inputs for the next processing step
         current_message = self.messages[self.time][self.theta]
         edge_is_in_topology = self.topology.has_edge(current_message.source_address.node_name,
                                                      current_message.target_address.node_name)
         if not edge_is_in_topology:
             warning_message = f'''
-            > WARNING: Message {str(current_message._id)} violates topology!
+            > WARNING: Message {message_id_to_string(current_message._id)} violates topology!
             > 
             > Edge {current_message.source_address.node_name} -> {current_message.target_address.node_name} is not in topology.
             '''
@@ -211,47 +452,43 @@ class Simulator:
             print('\033[96m' + warning_message + '\033[0m')
 
         target_address = current_message.target_address
-        if target_address not in self.states.keys():
+        created_state = target_address not in self.states.keys()
+        if created_state:
             neighbors = self.topology.get_neighbors(target_address.node_name)
-            new_seed = self.random_generator.integers(low=0, high=100000000)
-            empty_state: State = State(address=target_address, neighbors=neighbors, seed=new_seed)
-            self.states[target_address] = [empty_state]
+            new_seed = self.tracked_random_generator.integers(low=0, high=100000000)
+            self._add_state(State(address=target_address, neighbors=neighbors, seed=new_seed))
         current_state = self.states[target_address][-1]
-        algorithm = self.algorithms[target_address.algorithm]
-
-        # Collect all local states
-        local_state_copies: dict[Address, State] = {}
-        for address in self.states.keys():
-            if address.node_name == current_message.target_address.node_name:
-                local_state_copies[address] = copy.deepcopy(self.states[address][-1])
+        algorithm = self._get_compiled_algorithm(target_address.algorithm)
 
-        scope: dict[str, any] = {
-            "DefaultColors": DefaultColors,
-            "Color": Color,
-            "Message": Message,
-            "Address": Address,
-            "send": lambda msg: self.send(msg),
-            "send_to_self": lambda msg, delay: self.send_to_self(msg, delay),
-            "get_global_time": lambda: self.time,
-            "get_local_states": lambda: ReadOnlyDict(copy.deepcopy(local_state_copies))
-        }
-        algorithm = types.FunctionType(algorithm.__code__, dict(scope, **__builtins__))
+        self.context.time = self.time
+        self.context.states = self.states
+        self.context.local_addresses = self.addresses_by_node[target_address.node_name]
+        self.context.sent_messages = []
 
         # Execute the algorithm function and retrieve its results
-        self.last_send_messages = []
         new_state = current_state
+        if self.frozen_payloads and not is_frozen(current_message.data):
+            current_message.data = freeze(current_message.data)
         if not current_message._is_lost:
-            new_state = deepcopy(current_state)
-            algorithm(new_state, current_message.copy())
-            for hook in self.condition_hooks:
-                hook_function = types.FunctionType(hook.__code__, dict(scope, **__builtins__))
-                hook_function(new_state, current_message.copy(), self.last_send_messages)
-        new_messages: list[Message] = [deepcopy(msg) for msg in self.last_send_messages]
-        self.last_send_messages = []
+            new_state = current_state.next_version()
+            self._call_compiled(algorithm, new_state, current_message.copy())
+            for hook in self._get_compiled_hooks():
+                self._call_compiled(hook, new_state, current_message.copy(), self.context.sent_messages)
+            new_state.share_unchanged(current_state)
+        if self.frozen_payloads:
+            new_messages: list[Message] = [self._share_payload(msg) for msg in self.context.sent_messages]
+        else:
+            new_messages: list[Message] = [deepcopy(msg) for msg in self.context.sent_messages]
+        self.context.sent_messages = []
+        self.context.local_addresses = []
 
         # Update state
         self.states[target_address].append(new_state)
         current_message._child_messages = [msg._id for msg in new_messages]
+        if self.batch_random_draws:
+            # Usually one number for the loss and one for the scheduler of every message
+            self._random_batch = RandomBatch(self.tracked_random_generator,
+                                             2 * sum(1 for msg in new_messages if not msg._is_self_message))
         for msg in new_messages:
             msg._parent_message = current_message._id
             msg._creation_time = self.time
@@ -260,15 +497,105 @@ class Simulator:
                 self.insert_self_message_to_queue(msg)
             else:
                 self.insert_message_to_queue(msg)
-        self.random_number_generator_states.append(self.random_generator.__getstate__())
+        self._random_batch = None
+        self._record_step(current_message, current_state, new_state, new_messages,
+                          self.tracked_random_generator.state_before_use, created_state)
+        return current_message, current_state, new_state, new_messages
+
+    def _add_state(self, empty_state: State):
+        if self.checkpoint_interval is None:
+            self.states[empty_state.address] = [empty_state]
+        else:
+            self.states[empty_state.address] = StateHistory(self.checkpoint_interval, [empty_state])
+        self.addresses_by_node.setdefault(empty_state.address.node_name, []).append(empty_state.address)
 
-        # Update Node Color
-        self.node_colors[self.time, self.theta] = {}
-        self.node_colors[self.time, self.theta][target_address] = new_state.color
+    def _record_step(self, current_message: Message, current_state: State, new_state: State,
+                     new_messages: list[Message], random_state: int | dict[str, any] | None, created_state: bool):
+        # Bookkeeping once the new state has been appended and the new messages have been inserted
+        target_address = current_message.target_address
+        self.journal.append(JournalEntry(self.time, self.theta, current_message._id, list(current_message._child_messages),
+                                         target_address, random_state, created_state))
+        self.trace.append(current_message, self.topology.get_node_index(current_message.source_address.node_name),
+                          self.topology.get_node_index(target_address.node_name))
+
+        # Update Node Color and Neighbors. In delta encoded mode only transitions are recorded.
+        is_transition = (
+                self.checkpoint_interval is None
+                or created_state
+                or new_state.color is not current_state.color
+                or new_state.neighbors is not current_state.neighbors
+        )
+        if is_transition:
+            self.node_colors[self.time, self.theta] = {}
+            self.node_colors[self.time, self.theta][target_address] = new_state.color
+            self.node_neighbors[self.time, self.theta] = {}
+            self.node_neighbors[self.time, self.theta][target_address] = new_state.neighbors
+        if self.trace_writer is not None:
+            self.trace_writer.write_step(self, current_state, new_state, new_messages, random_state)
+
+    def run(self, until: Callable[['Simulator'], bool] | None = None, max_steps: int | None = None,
+            max_time: int | None = None) -> RunResult:
+        # Executes steps without building the summaries that step_forward returns
+        result = RunResult()
+        while True:
+            if max_steps is not None and result.steps >= max_steps:
+                result.stop_reason = StopReason.MAX_STEPS
+                break
+            if until is not None and until(self):
+                result.stop_reason = StopReason.PREDICATE
+                break
+            new_position = self.find_next()
+            if new_position is None:
+                result.stop_reason = StopReason.QUIESCENCE
+                break
+            if max_time is not None and new_position[0] > max_time:
+                result.stop_reason = StopReason.MAX_TIME
+                break
+            current_message, current_state, new_state, new_messages = self._execute_step(new_position)
+            result.steps += 1
+            result.sent_messages += len(new_messages)
+            for msg in new_messages:
+                if msg._is_lost:
+                    result.lost_messages += 1
+        result.time = self.time
+        result.theta = self.theta
+        return result
+
+    def seek(self, time: int, theta: int) -> SeekResult:
+        # Moves to the latest position at or before (time, theta). Like run, no summaries of the steps are built.
+        result = SeekResult()
+        target = (time, theta)
+        changed_addresses: dict[Address, None] = {}
+        if self.time is not None and (self.time, self.theta) > target:
+            # The positions in the journal are increasing, so the first step to undo is found by bisection.
+            # Older versions of the states are restored from their (delta encoded) history.
+            first_undone = bisect.bisect_right(self.journal, target, key=lambda entry: (entry.time, entry.theta))
+            while len(self.journal) > first_undone:
+                current_message, removed_messages = self._undo_step()
+                changed_addresses[current_message.target_address] = None
+                result.steps -= 1
+            # A simulator that was loaded from a snapshot can not be rewound past the snapshot. It stays at the
+            # earliest position it could reach.
+            result.reached = self.time is None or (self.time, self.theta) <= target
+        else:
+            while True:
+                new_position = self.find_next()
+                if new_position is None or new_position > target:
+                    break
+                current_message, current_state, new_state, new_messages = self._execute_step(new_position)
+                changed_addresses[current_message.target_address] = None
+                result.steps += 1
+        result.time = self.time
+        result.theta = self.theta
+        result.changed_addresses = list(changed_addresses.keys())
+        return result
 
-        # Update Node Neighbors
-        self.node_neighbors[self.time, self.theta] = {}
-        self.node_neighbors[self.time, self.theta][target_address] = new_state.neighbors
+    def step_forward(self, verbose=False) -> dict[str, any] | None:
+        new_position = self.find_next()
+        if new_position is None:
+            return None
+        current_message, current_state, new_state, new_messages = self._execute_step(new_position)
+        target_address = current_message.target_address
 
         if verbose:
             new_row = "\n                    "
@@ -298,7 +625,7 @@ class Simulator:
                   f'                    neighbors:    {current_state.neighbors} -> {new_state.neighbors},\n'
                   f'                }}\n'
                   f'New Messages:   {new_messages_str}\n'
-                  f'Queue Times:    {sorted(self.messages.keys())}\n'
+                  f'Queue Times:    {self.messages.times()}\n'
                   f'===================================================================================\n'
                   )
 
@@ -317,36 +644,39 @@ class Simulator:
         }
         return action
 
-    def step_backward(self, verbose=False) -> dict[str, any] | None:
-
-        if self.time is None and self.theta is None:
-            return None
-
-        # Undo action
+    def _undo_step(self) -> Tuple[Message, list[Message]]:
+        journal_entry = self.journal.pop()
+        self.trace.pop()
+        if self.trace_writer is not None:
+            self.trace_writer.write_undo()
         current_message: Message = self.messages[self.time][self.theta]
         removed_messages: list[Message] = []
-        for t in list(self.messages.keys()):
-            keep_messages: list[Message] = []
-            for msg in self.messages[t]:
-                if msg._id in current_message._child_messages:
-                    removed_messages.append(msg)
-                else:
-                    keep_messages.append(msg)
-            self.messages[t] = keep_messages
-            if len(self.messages[t]) == 0:
-                del self.messages[t]
+        for child_id in journal_entry.child_ids:
+            child = self.messages.get_message(child_id)
+            if child is not None:
+                removed_messages.append(child)
+        # Report the children in the order in which they appear in the queue, like a scan over the queue would
+        removed_messages.sort(key=self.messages._iteration_key)
+        # Children are usually the last messages of their time slot, so removing them in reverse is cheap
+        for msg in reversed(removed_messages):
+            self.messages.remove(msg)
+        current_message._child_messages = []
 
         # Remove Node Color
-        del self.node_colors[self.time, self.theta]
+        self.node_colors.pop((self.time, self.theta), None)
 
         # Remove Node Neighbors
-        del self.node_neighbors[self.time, self.theta]
+        self.node_neighbors.pop((self.time, self.theta), None)
 
         self.states[current_message.target_address].pop()
-        if len(self.states[current_message.target_address]) == 1:
+        if journal_entry.created_state:
             del self.states[current_message.target_address]
-        self.random_number_generator_states.pop()
-        self.random_generator.__setstate__(self.random_number_generator_states[-1])
+            local_addresses = self.addresses_by_node[current_message.target_address.node_name]
+            local_addresses.remove(current_message.target_address)
+            if len(local_addresses) == 0:
+                del self.addresses_by_node[current_message.target_address.node_name]
+        if journal_entry.random_state is not None:
+            restore_random_state(self.random_generator, journal_entry.random_state)
 
         # Decrease time
         new_position = self.find_previous()
@@ -356,6 +686,18 @@ class Simulator:
         else:
             self.time = new_position[0]
             self.theta = new_position[1]
+        self.messages.set_cursor(self.time, self.theta)
+        return current_message, removed_messages
+
+    def step_backward(self, verbose=False) -> dict[str, any] | None:
+
+        if self.time is None and self.theta is None:
+            return None
+        # A simulator that was restored from a snapshot can not go back further than the snapshot
+        if len(self.journal) == 0:
+            return None
+
+        current_message, removed_messages = self._undo_step()
 
         if verbose:
             new_row = "\n                    "
@@ -380,7 +722,7 @@ class Simulator:
                   f'                    self_message: {current_message.summary()["self_message"]}\n'
                   f'                }}\n'
                   f'Removed:        {removed_messages_str}\n'
-                  f'Queue Times:    {sorted(self.messages.keys())}\n'
+                  f'Queue Times:    {self.messages.times()}\n'
                   f'===================================================================================\n'
                   )
 
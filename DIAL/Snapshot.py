@@ -0,0 +1,358 @@
+import pickle
+from typing import BinaryIO
+
+import numpy
+
+from DIAL.Message import Message, message_id_to_string
+from DIAL.MessageQueue import MessageQueue, QueueBackend
+from DIAL.RandomGenerator import TrackedRandomGenerator
+from DIAL.Simulator import Algorithm, ConditionHook, ExecutionContext, Simulator
+from DIAL.State import State
+from DIAL.StateHistory import StateHistory
+from DIAL.Topology import Topology, DefaultTopologies
+from DIAL.TraceStore import TraceStore
+
+# A snapshot is a NumPy .npz archive. Everything that exists once per message, state or edge is stored in typed
+# columns. Values that do not fit into a column (the data of messages and states, neighbors, edge configs, ...)
+# are pickled together as a single object, so restoring a snapshot does not unpickle every message on its own.
+# Only the latest version of every state is stored: a restored simulator can not step back beyond the snapshot.
+_format_version: int = 2
+_id_mask: int = 2 ** 64 - 1
+
+
+class _Table:
+    # Numbers distinct values in the order they are first seen
+    values: list[any]
+    _indices: dict[any, int]
+
+    def __init__(self):
+        self.values = []
+        self._indices = {}
+
+    def index(self, value: any) -> int:
+        index = self._indices.get(value)
+        if index is None:
+            index = len(self.values)
+            self._indices[value] = index
+            self.values.append(value)
+        return index
+
+
+def _split_ids(message_ids: list[int]) -> tuple[numpy.ndarray, numpy.ndarray]:
+    # Message IDs can have up to 128 bits (e.g. random UUIDs), so they are stored as two 64 bit columns
+    if max(message_ids, default=0) <= _id_mask:
+        return numpy.zeros(len(message_ids), dtype=numpy.uint64), numpy.array(message_ids, dtype=numpy.uint64)
+    high = numpy.array([message_id >> 64 for message_id in message_ids], dtype=numpy.uint64)
+    low = numpy.array([message_id & _id_mask for message_id in message_ids], dtype=numpy.uint64)
+    return high, low
+
+
+def _join_ids(high: numpy.ndarray, low: numpy.ndarray) -> list[int]:
+    if not high.any():
+        return low.tolist()
+    return [(h << 64) | l for h, l in zip(high.tolist(), low.tolist())]
+
+
+def _latest_transitions(transitions: dict[tuple[int, int], dict[any, any]]) -> list[tuple[tuple[int, int], any, any]]:
+    # The latest recorded transition of every address in the order in which they were recorded
+    latest: dict[any, tuple[tuple[int, int], any]] = {}
+    for time_tuple, values in transitions.items():
+        for address, value in values.items():
+            latest[address] = (time_tuple, value)
+    return sorted(((time_tuple, address, value) for address, (time_tuple, value) in latest.items()),
+                  key=lambda transition: transition[0])
+
+
+def _new_generator(random_state: dict[str, any]) -> numpy.random.Generator:
+    # Packed states can only be restored into the generator they were taken from, so the full state is stored
+    generator = numpy.random.Generator(getattr(numpy.random, random_state["bit_generator"])())
+    generator.bit_generator.state = random_state
+    return generator
+
+
+def save_snapshot(simulator: Simulator, path: str | BinaryIO, include_topology: bool = True, compressed: bool = False):
+    # Stores the current position of the simulator. Algorithms and condition hooks are supplied again when the
+    # snapshot is loaded, as well as the topology if include_topology is False.
+    addresses = _Table()
+    colors = _Table()
+    titles = _Table()
+    arrays: dict[str, numpy.ndarray] = {}
+    objects: dict[str, any] = {}
+
+    # Messages in the order of the queue: time slots in the order they were created, then by theta
+    slot_times: list[int] = []
+    slot_sizes: list[int] = []
+    message_ids: list[int] = []
+    parent_ids: list[int] = []
+    has_parent: list[bool] = []
+    sources: list[int] = []
+    targets: list[int] = []
+    message_colors: list[int] = []
+    message_titles: list[int] = []
+    is_lost: list[bool] = []
+    is_self_message: list[bool] = []
+    self_message_delays: list[int] = []
+    creation_times: list[int] = []
+    creation_thetas: list[int] = []
+    child_counts: list[int] = []
+    child_ids: list[int] = []
+    data_positions: list[int] = []
+    data: list[any] = []
+    for time, slot in simulator.messages.items():
+        slot_times.append(time)
+        slot_sizes.append(len(slot))
+        for message in slot:
+            message_ids.append(message._id)
+            has_parent.append(message._parent_message is not None)
+            parent_ids.append(0 if message._parent_message is None else message._parent_message)
+            sources.append(addresses.index(message.source_address))
+            targets.append(addresses.index(message.target_address))
+            message_colors.append(colors.index(message.color))
+            # Most messages have the default title, which is derived from their ID again
+            message_titles.append(-1 if message.title == message_id_to_string(message._id) else titles.index(message.title))
+            is_lost.append(message._is_lost)
+            is_self_message.append(message._is_self_message)
+            self_message_delays.append(message._self_message_delay)
+            creation_times.append(message._creation_time)
+            creation_thetas.append(message._creation_theta)
+            child_counts.append(len(message._child_messages))
+            child_ids.extend(message._child_messages)
+            if type(message.data) is not dict or len(message.data) > 0:
+                data_positions.append(len(message_ids) - 1)
+                data.append(message.data)
+    arrays["slot_times"] = numpy.array(slot_times, dtype=numpy.int64)
+    arrays["slot_sizes"] = numpy.array(slot_sizes, dtype=numpy.int64)
+    arrays["message_id_high"], arrays["message_id_low"] = _split_ids(message_ids)
+    arrays["message_parent_high"], arrays["message_parent_low"] = _split_ids(parent_ids)
+    arrays["message_has_parent"] = numpy.array(has_parent, dtype=bool)
+    arrays["message_source"] = numpy.array(sources, dtype=numpy.int32)
+    arrays["message_target"] = numpy.array(targets, dtype=numpy.int32)
+    arrays["message_color"] = numpy.array(message_colors, dtype=numpy.int32)
+    arrays["message_title"] = numpy.array(message_titles, dtype=numpy.int32)
+    arrays["message_is_lost"] = numpy.array(is_lost, dtype=bool)
+    arrays["message_is_self_message"] = numpy.array(is_self_message, dtype=bool)
+    arrays["message_self_message_delay"] = numpy.array(self_message_delays, dtype=numpy.int64)
+    arrays["message_creation_time"] = numpy.array(creation_times, dtype=numpy.int64)
+    arrays["message_creation_theta"] = numpy.array(creation_thetas, dtype=numpy.int64)
+    arrays["message_child_count"] = numpy.array(child_counts, dtype=numpy.int64)
+    arrays["message_child_high"], arrays["message_child_low"] = _split_ids(child_ids)
+    arrays["message_data_position"] = numpy.array(data_positions, dtype=numpy.int64)
+    objects["message_data"] = data
+
+    # The latest version of every state
+    state_addresses: list[int] = []
+    state_colors: list[int] = []
+    state_neighbors: list[list[str]] = []
+    state_data: list[dict[str, any]] = []
+    state_random_states: list[dict[str, any]] = []
+    state_attributes: list[dict[str, any]] = []
+    for address, history in simulator.states.items():
+        state = history[-1]
+        state_addresses.append(addresses.index(address))
+        state_colors.append(colors.index(state.color))
+        state_neighbors.append(state.neighbors)
+        state_data.append(state.data)
+        state_random_states.append(state._random_number_generator.bit_generator.state)
+        state_attributes.append(state._extra_attributes())
+    arrays["state_address"] = numpy.array(state_addresses, dtype=numpy.int32)
+    arrays["state_color"] = numpy.array(state_colors, dtype=numpy.int32)
+    objects["state_neighbors"] = state_neighbors
+    objects["state_data"] = state_data
+    objects["state_random_states"] = state_random_states
+    objects["state_attributes"] = state_attributes
+
+    # Only the latest color and neighbor transition of every state is kept
+    color_transitions = _latest_transitions(simulator.node_colors)
+    arrays["color_transition_time"] = numpy.array([t[0][0] for t in color_transitions], dtype=numpy.int64)
+    arrays["color_transition_theta"] = numpy.array([t[0][1] for t in color_transitions], dtype=numpy.int64)
+    arrays["color_transition_address"] = numpy.array([addresses.index(t[1]) for t in color_transitions], dtype=numpy.int32)
+    arrays["color_transition_color"] = numpy.array([colors.index(t[2]) for t in color_transitions], dtype=numpy.int32)
+    neighbor_transitions = _latest_transitions(simulator.node_neighbors)
+    arrays["neighbor_transition_time"] = numpy.array([t[0][0] for t in neighbor_transitions], dtype=numpy.int64)
+    arrays["neighbor_transition_theta"] = numpy.array([t[0][1] for t in neighbor_transitions], dtype=numpy.int64)
+    arrays["neighbor_transition_address"] = numpy.array([addresses.index(t[1]) for t in neighbor_transitions], dtype=numpy.int32)
+    objects["neighbor_transition_neighbors"] = [t[2] for t in neighbor_transitions]
+
+    for name, values in simulator.trace.arrays().items():
+        arrays[f"trace_{name}"] = values
+
+    if include_topology:
+        topology = simulator.topology
+        configs = _Table()
+        node_positions = {node: position for position, node in enumerate(topology.nodes)}
+        arrays["edge_source"] = numpy.array([node_positions[edge[0]] for edge in topology.edges.keys()], dtype=numpy.int32)
+        arrays["edge_target"] = numpy.array([node_positions[edge[1]] for edge in topology.edges.keys()], dtype=numpy.int32)
+        arrays["edge_config"] = numpy.array([configs.index(config) for config in topology.edges.values()], dtype=numpy.int32)
+        try:
+            pickle.dumps(configs.values)
+        except (pickle.PicklingError, AttributeError, TypeError):
+            print("Error: The schedulers of the topology can not be stored in a snapshot! "
+                  "Save it with include_topology=False and supply the topology when loading it.")
+            exit(1)
+        objects["topology"] = {
+            "nodes": topology.nodes,
+            "all_nodes_have_loops": topology.all_nodes_have_loops,
+            "edge_configs": configs.values
+        }
+
+    objects["addresses"] = addresses.values
+    objects["colors"] = colors.values
+    objects["titles"] = titles.values
+    objects["simulator"] = {
+        "time": simulator.time,
+        "theta": simulator.theta,
+        "random_state": simulator.random_generator.bit_generator.state,
+        "queue_backend": simulator.messages.backend.name,
+        "checkpoint_interval": simulator.checkpoint_interval,
+        "batch_random_draws": simulator.batch_random_draws,
+        "frozen_payloads": simulator.frozen_payloads
+    }
+    arrays["objects"] = numpy.frombuffer(pickle.dumps(objects, protocol=pickle.HIGHEST_PROTOCOL), dtype=numpy.uint8)
+    arrays["dial_snapshot"] = numpy.array([_format_version], dtype=numpy.int64)
+
+    savez = numpy.savez_compressed if compressed else numpy.savez
+    if isinstance(path, str):
+        # A file object keeps numpy from appending .npz to the path
+        with open(path, "wb") as file:
+            savez(file, **arrays)
+    else:
+        savez(path, **arrays)
+
+
+def load_snapshot(path: str | BinaryIO, algorithms: dict[str, Algorithm], condition_hooks: list[ConditionHook] = [],
+                  topology: Topology | DefaultTopologies | None = None) -> Simulator:
+    # Restores a simulator from a snapshot. The topology of the snapshot is used unless another one is supplied.
+    archive = numpy.load(path)
+    if not isinstance(archive, numpy.lib.npyio.NpzFile) or "dial_snapshot" not in archive.files:
+        print(f"Error: '{path}' is not a snapshot!")
+        exit(1)
+    with archive:
+        arrays = {name: archive[name] for name in archive.files}
+    if int(arrays["dial_snapshot"][0]) != _format_version:
+        print(f"Error: The snapshot '{path}' has an unsupported format!")
+        exit(1)
+    objects = pickle.loads(arrays["objects"].tobytes())
+    addresses = objects["addresses"]
+    colors = objects["colors"]
+    titles = objects["titles"]
+    settings = objects["simulator"]
+
+    if isinstance(topology, DefaultTopologies):
+        topology = topology.topology_object
+    if topology is None:
+        if "topology" not in objects:
+            print(f"Error: The snapshot '{path}' does not contain a topology! Supply the topology when loading it.")
+            exit(1)
+        topology = Topology(all_nodes_have_loops=False)
+        for node in objects["topology"]["nodes"]:
+            topology.add_node(node)
+        nodes = topology.nodes
+        edge_configs = objects["topology"]["edge_configs"]
+        # The edges are stored with both directions, so they are set directly
+        for source, target, config in zip(arrays["edge_source"].tolist(), arrays["edge_target"].tolist(),
+                                          arrays["edge_config"].tolist()):
+            topology._set_edge(nodes[source], nodes[target], edge_configs[config])
+        topology.all_nodes_have_loops = objects["topology"]["all_nodes_have_loops"]
+
+    # Messages
+    message_ids = _join_ids(arrays["message_id_high"], arrays["message_id_low"])
+    parent_ids = _join_ids(arrays["message_parent_high"], arrays["message_parent_low"])
+    has_parent = arrays["message_has_parent"].tolist()
+    sources = arrays["message_source"].tolist()
+    targets = arrays["message_target"].tolist()
+    message_colors = arrays["message_color"].tolist()
+    message_titles = arrays["message_title"].tolist()
+    is_lost = arrays["message_is_lost"].tolist()
+    is_self_message = arrays["message_is_self_message"].tolist()
+    self_message_delays = arrays["message_self_message_delay"].tolist()
+    creation_times = arrays["message_creation_time"].tolist()
+    creation_thetas = arrays["message_creation_theta"].tolist()
+    child_ids = _join_ids(arrays["message_child_high"], arrays["message_child_low"])
+    data = dict(zip(arrays["message_data_position"].tolist(), objects["message_data"]))
+    child_offsets = numpy.concatenate(([0], numpy.cumsum(arrays["message_child_count"]))).tolist()
+    messages: list[Message] = []
+    for position, (message_id, parent_id, source, target, color, title, lost, self_message, delay, creation_time,
+                   creation_theta) in enumerate(zip(message_ids, parent_ids, sources, targets, message_colors,
+                                                    message_titles, is_lost, is_self_message, self_message_delays,
+                                                    creation_times, creation_thetas)):
+        message = Message.__new__(Message)
+        message._id = message_id
+        message.title = message_id_to_string(message_id) if title < 0 else titles[title]
+        message.color = colors[color]
+        message.source_address = addresses[source]
+        message.target_address = addresses[target]
+        message.data = data.get(position, {})
+        message._parent_message = parent_id if has_parent[position] else None
+        message._child_messages = child_ids[child_offsets[position]:child_offsets[position + 1]]
+        message._is_lost = lost
+        message._is_self_message = self_message
+        message._self_message_delay = delay
+        message._creation_time = creation_time
+        message._creation_theta = creation_theta
+        messages.append(message)
+    # The queue sets the arrival time and theta of every message
+    queue: dict[int, list[Message]] = {}
+    start = 0
+    for time, size in zip(arrays["slot_times"].tolist(), arrays["slot_sizes"].tolist()):
+        queue[time] = messages[start:start + size]
+        start += size
+    cursor = None if settings["time"] is None else (settings["time"], settings["theta"])
+
+    # States
+    checkpoint_interval = settings["checkpoint_interval"]
+    states: dict[any, list[State] | StateHistory] = {}
+    addresses_by_node: dict[str, list[any]] = {}
+    for address_index, color_index, neighbors, state_data, random_state, attributes in zip(
+            arrays["state_address"].tolist(), arrays["state_color"].tolist(), objects["state_neighbors"],
+            objects["state_data"], objects["state_random_states"], objects["state_attributes"]):
+        state = State.__new__(State)
+        state.__dict__.update(attributes)
+        state.address = addresses[address_index]
+        state.color = colors[color_index]
+        state.neighbors = neighbors
+        state.data = state_data
+        state._random_number_generator = _new_generator(random_state)
+        state._random_number_generator_is_shared = False
+        states[state.address] = [state] if checkpoint_interval is None else StateHistory(checkpoint_interval, [state])
+        addresses_by_node.setdefault(state.address.node_name, []).append(state.address)
+
+    node_colors: dict[tuple[int, int], dict[any, any]] = {}
+    for time, theta, address_index, color_index in zip(
+            arrays["color_transition_time"].tolist(), arrays["color_transition_theta"].tolist(),
+            arrays["color_transition_address"].tolist(), arrays["color_transition_color"].tolist()):
+        node_colors.setdefault((time, theta), {})[addresses[address_index]] = colors[color_index]
+    node_neighbors: dict[tuple[int, int], dict[any, list[str]]] = {}
+    for time, theta, address_index, neighbors in zip(
+            arrays["neighbor_transition_time"].tolist(), arrays["neighbor_transition_theta"].tolist(),
+            arrays["neighbor_transition_address"].tolist(), objects["neighbor_transition_neighbors"]):
+        node_neighbors.setdefault((time, theta), {})[addresses[address_index]] = neighbors
+
+    trace = TraceStore()
+    trace.extend({name[len("trace_"):]: values for name, values in arrays.items() if name.startswith("trace_")})
+
+    random_generator = _new_generator(settings["random_state"])
+    simulator = Simulator.__new__(Simulator)
+    simulator.__setstate__({
+        "random_generator": random_generator,
+        "tracked_random_generator": TrackedRandomGenerator(random_generator),
+        "batch_random_draws": settings["batch_random_draws"],
+        "_random_batch": None,
+        "topology": topology,
+        "algorithms": algorithms,
+        "condition_hooks": condition_hooks,
+        "messages": MessageQueue(queue, backend=QueueBackend[settings["queue_backend"]], cursor=cursor),
+        "_queue_view": None,
+        "time": settings["time"],
+        "theta": settings["theta"],
+        "states": states,
+        "addresses_by_node": addresses_by_node,
+        "node_colors": node_colors,
+        "node_neighbors": node_neighbors,
+        "journal": [],
+        "trace": trace,
+        "trace_writer": None,
+        "checkpoint_interval": checkpoint_interval,
+        "frozen_payloads": settings["frozen_payloads"],
+        "context": ExecutionContext()
+    })
+    return simulator
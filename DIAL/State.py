@@ -4,7 +4,13 @@ from copy import deepcopy
 import numpy
 from DIAL.Error import Error
 from DIAL.Address import Address
+from DIAL.BinaryPayload import encode_binary_payloads, decode_binary_payloads
 from DIAL.Color import Color, DefaultColors
+from DIAL.CopyOnWriteDict import CopyOnWriteDict, _has_aliased_values, _is_unchanged
+
+# Attributes every state has. Anything else in state.__dict__ was set by an algorithm.
+_state_attributes: frozenset[str] = frozenset({"address", "color", "neighbors", "data", "_random_number_generator",
+                                               "_random_number_generator_is_shared"})
 
 
 class State:
@@ -12,17 +18,77 @@ class State:
     color: Color
     neighbors: list[str]
     data: dict[str, any]
-    random_number_generator: numpy.random.Generator
+
+    _random_number_generator: numpy.random.Generator
+    _random_number_generator_is_shared: bool
 
     def __init__(self, address: Address, neighbors: list[str] = [], seed: int | None = None):
         self.address = address
         self.color = Color()
         self.neighbors = neighbors
         self.data = {}
-        self.random_number_generator = numpy.random.default_rng(seed=seed)
+        self._random_number_generator = numpy.random.default_rng(seed=seed)
+        self._random_number_generator_is_shared = False
+
+    @property
+    def random_number_generator(self) -> numpy.random.Generator:
+        # The generator is only copied once a new version actually uses it
+        if self._random_number_generator_is_shared:
+            self._random_number_generator = deepcopy(self._random_number_generator)
+            self._random_number_generator_is_shared = False
+        return self._random_number_generator
+
+    @random_number_generator.setter
+    def random_number_generator(self, random_number_generator: numpy.random.Generator):
+        self._random_number_generator = random_number_generator
+        self._random_number_generator_is_shared = False
 
     def update_color(self, color: Color):
-        self.color = deepcopy(color)
+        self.color = color
+
+    def _extra_attributes(self) -> dict[str, any]:
+        # Attributes that an algorithm has set on the state in addition to the ones above
+        return {name: value for name, value in self.__dict__.items() if name not in _state_attributes}
+
+    def next_version(self) -> 'State':
+        # Creates the state that an algorithm step works on. Instead of a deep copy the new version shares
+        # everything with this one and only copies the values of state.data that are accessed.
+        # Attributes set by an algorithm are deep-copied, because it can not be told when they are changed.
+        # If the same object is the value of several keys or attributes, copying only some of them would break
+        # up the reference, so in that case everything is copied at once like before.
+        state = State.__new__(State)
+        extra_attributes = self._extra_attributes()
+        if _has_aliased_values(self.data, extra_attributes):
+            data, extra_attributes = deepcopy((dict(dict.items(self.data)), extra_attributes))
+            state.data = data
+        else:
+            state.data = CopyOnWriteDict(self.data)
+            if len(extra_attributes) > 0:
+                # The memo of state.data keeps references between attributes and data intact
+                extra_attributes = deepcopy(extra_attributes, state.data._memo)
+        state.__dict__.update(extra_attributes)
+        state.address = self.address
+        state.color = self.color
+        state.neighbors = list(self.neighbors)
+        state._random_number_generator = self._random_number_generator
+        state._random_number_generator_is_shared = True
+        return state
+
+    def share_unchanged(self, previous: 'State'):
+        # Called once the step has finished: data values that were not accessed are still shared with the previous
+        # version. Neighbors, color and attributes set by an algorithm are shared again if they are equal.
+        if isinstance(self.data, CopyOnWriteDict):
+            self.data = self.data.settle()
+        extra_attributes = self._extra_attributes()
+        # An attribute that is also the value of another key or attribute must stay this exact object
+        if not _has_aliased_values(self.data, extra_attributes):
+            for name, value in extra_attributes.items():
+                if name in previous.__dict__ and _is_unchanged(value, previous.__dict__[name]):
+                    self.__dict__[name] = previous.__dict__[name]
+        if _is_unchanged(self.neighbors, previous.neighbors):
+            self.neighbors = previous.neighbors
+        if _is_unchanged(self.color, previous.color):
+            self.color = previous.color
 
     def to_json(self):
         color = self.color
@@ -32,10 +98,10 @@ class State:
             "color": str(color.__repr__()),
             "address": str(self.address.__repr__()),
             "neighbors": self.neighbors,
-            "data": self.data
+            "data": encode_binary_payloads(self.data)
         }
         try:
-            json.dumps(self.data)
+            json.dumps(json_representation["data"])
         except TypeError as error:
             warning_message = f"""
                     > Warning: '{error}'
@@ -132,5 +198,5 @@ class StateParser:
         type_matches = isinstance(json[key], dict) and all(isinstance(x, str) for x in json[key].keys())
         if not type_matches:
             return Error(f"state.{key} must be of type dict[str, any]")
-        return json[key]
+        return decode_binary_payloads(json[key])
 
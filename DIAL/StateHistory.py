@@ -0,0 +1,145 @@
+from DIAL.State import State
+
+_missing: object = object()
+
+
+def _snapshot(state: State) -> State:
+    snapshot = State.__new__(State)
+    snapshot.__dict__.update(state._extra_attributes())
+    snapshot.address = state.address
+    snapshot.color = state.color
+    snapshot.neighbors = state.neighbors
+    snapshot.data = dict(state.data)
+    snapshot._random_number_generator = state._random_number_generator
+    # The generator might still be referenced by other versions
+    snapshot._random_number_generator_is_shared = True
+    return snapshot
+
+
+class StateDelta:
+    # Everything that is needed to turn a version of a state back into its predecessor.
+    # Attributes that did not change between the two versions are None.
+    data: dict[str, any] | None
+    keys: list[str] | None
+    color: any
+    neighbors: list[str] | None
+    random_number_generator: any
+    attributes: dict[str, any] | None
+
+    def __init__(self, older: State, newer: State):
+        self.data = None
+        self.keys = None
+        self.color = None
+        self.neighbors = None
+        self.random_number_generator = None
+        self.attributes = None
+        if older is newer:
+            return
+        # Unchanged values are shared between versions, so comparing references is sufficient
+        changed: dict[str, any] = {}
+        for key, value in older.data.items():
+            if key not in newer.data or newer.data[key] is not value:
+                changed[key] = value
+        if len(changed) > 0:
+            self.data = changed
+        if len(older.data) != len(newer.data) or any(key not in older.data for key in newer.data.keys()):
+            self.keys = list(older.data.keys())
+        if older.color is not newer.color:
+            self.color = older.color
+        if older.neighbors is not newer.neighbors:
+            self.neighbors = older.neighbors
+        if older._random_number_generator is not newer._random_number_generator:
+            self.random_number_generator = older._random_number_generator
+        # Attributes set by an algorithm are rare, so all of them are stored as soon as one of them changed
+        older_attributes = older._extra_attributes()
+        newer_attributes = newer._extra_attributes()
+        attributes_changed = any(newer_attributes.get(name, _missing) is not value for name, value in older_attributes.items())
+        if attributes_changed or len(older_attributes) != len(newer_attributes):
+            self.attributes = older_attributes
+
+    def apply(self, newer: State) -> State:
+        older = _snapshot(newer)
+        if self.color is not None:
+            older.color = self.color
+        if self.neighbors is not None:
+            older.neighbors = self.neighbors
+        if self.keys is not None:
+            changed = self.data if self.data is not None else {}
+            older.data = {key: changed[key] if key in changed else newer.data[key] for key in self.keys}
+        elif self.data is not None:
+            older.data.update(self.data)
+        if self.random_number_generator is not None:
+            older._random_number_generator = self.random_number_generator
+        if self.attributes is not None:
+            for name in newer._extra_attributes().keys():
+                del older.__dict__[name]
+            older.__dict__.update(self.attributes)
+        return older
+
+
+class StateHistory:
+    # Sequence of all versions of one state that only keeps the latest version as a full State object.
+    # Every older version is stored as the difference to its successor and every checkpoint_interval
+    # versions a snapshot is kept, so any version can be rebuilt from the closest later snapshot.
+    checkpoint_interval: int
+
+    _head: State | None
+    _deltas: list[StateDelta]
+    _checkpoints: dict[int, State]
+
+    def __init__(self, checkpoint_interval: int, states: list[State] = []):
+        if checkpoint_interval < 1:
+            raise ValueError("checkpoint_interval must be at least 1")
+        self.checkpoint_interval = checkpoint_interval
+        self._head = None
+        self._deltas = []
+        self._checkpoints = {}
+        for state in states:
+            self.append(state)
+
+    def __len__(self) -> int:
+        if self._head is None:
+            return 0
+        return len(self._deltas) + 1
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index: int) -> State:
+        length = len(self)
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError("StateHistory index out of range")
+        position = length - 1
+        state = self._head
+        checkpoint = -(-index // self.checkpoint_interval) * self.checkpoint_interval
+        if checkpoint in self._checkpoints:
+            position = checkpoint
+            # Hand out a copy so that the snapshot itself can not be modified
+            state = _snapshot(self._checkpoints[checkpoint])
+        while position > index:
+            position -= 1
+            state = self._deltas[position].apply(state)
+        return state
+
+    def append(self, state: State):
+        if self._head is not None:
+            index = len(self._deltas)
+            self._deltas.append(StateDelta(older=self._head, newer=state))
+            if index % self.checkpoint_interval == 0:
+                self._checkpoints[index] = _snapshot(self._head)
+        self._head = state
+
+    def pop(self) -> State:
+        if self._head is None:
+            raise IndexError("pop from empty StateHistory")
+        state = self._head
+        if len(self._deltas) == 0:
+            self._head = None
+            return state
+        delta = self._deltas.pop()
+        self._checkpoints.pop(len(self._deltas), None)
+        self._head = delta.apply(state)
+        return state
@@ -0,0 +1,180 @@
+import copy
+import csv
+import json
+import multiprocessing
+from enum import Enum
+from typing import Iterator
+
+import numpy
+
+from DIAL.Color import DefaultColors
+from DIAL.Simulator import Simulator, StopReason
+from DIAL.Topology import EdgeConfig, DefaultTopologies
+
+_simulator_parameters: list[str] = ["topology", "algorithms", "initial_messages", "seed", "condition_hooks",
+                                    "queue_backend", "checkpoint_interval", "batch_random_draws",
+                                    "frozen_payloads"]
+_edge_parameters: list[str] = ["scheduler", "reliability"]
+
+# The sweep that is currently executed. Worker processes are forked and inherit it, so algorithms and
+# messages never have to be pickled.
+_active_sweep: 'Sweep | None' = None
+
+
+def _python_value(value: any) -> any:
+    # Values taken from NumPy arrays (e.g. numpy.linspace) become the matching Python type, so that they can be
+    # serialized to JSON and behave like the values the simulator is usually configured with
+    if isinstance(value, numpy.generic):
+        return value.item()
+    return value
+
+
+def _label(value: any) -> str | None:
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return str(value)
+    if hasattr(value, "__name__"):
+        return value.__name__
+    return None
+
+
+def _run_index(index: int) -> dict[str, any]:
+    try:
+        return _active_sweep.run_single(index)
+    except SystemExit:
+        # The simulator exits on configuration errors, which would leave the pool waiting for the result forever
+        raise RuntimeError(f"Run {index} of the sweep failed while setting up the simulator.")
+
+
+class Sweep:
+    # Runs one headless simulation for every combination of the given parameter values.
+    # Parameters can be any argument of the Simulator. The additional parameters 'scheduler' and 'reliability'
+    # replace the scheduler and reliability of every edge of the topology that is not a self-loop.
+    parameters: dict[str, list[any]]
+    fixed_parameters: dict[str, any]
+    max_steps: int | None
+    max_time: int | None
+    processes: int | None
+
+    def __init__(self, parameters: dict[str, list[any]], max_steps: int | None = None, max_time: int | None = None,
+                 processes: int | None = None, **fixed_parameters):
+        for name in list(parameters.keys()) + list(fixed_parameters.keys()):
+            if name not in _simulator_parameters and name not in _edge_parameters:
+                print(f"Error: Unknown sweep parameter '{name}'!")
+                exit(1)
+        for name in ["topology", "algorithms", "initial_messages"]:
+            if name not in parameters.keys() and name not in fixed_parameters.keys():
+                print(f"Error: Sweep parameter '{name}' is missing!")
+                exit(1)
+        self.parameters = {name: [_python_value(value) for value in values] for name, values in parameters.items()}
+        self.fixed_parameters = {name: _python_value(value) for name, value in fixed_parameters.items()}
+        self.max_steps = max_steps
+        self.max_time = max_time
+        self.processes = processes
+
+    def __len__(self) -> int:
+        count = 1
+        for values in self.parameters.values():
+            count *= len(values)
+        return count
+
+    def positions(self, index: int) -> dict[str, int]:
+        # Same order as itertools.product: the last parameter changes fastest
+        positions: dict[str, int] = {}
+        for name in reversed(list(self.parameters.keys())):
+            index, positions[name] = divmod(index, len(self.parameters[name]))
+        return {name: positions[name] for name in self.parameters.keys()}
+
+    def run_parameters(self, index: int) -> dict[str, any]:
+        run = dict(self.fixed_parameters)
+        for name, position in self.positions(index).items():
+            run[name] = self.parameters[name][position]
+        return run
+
+    def labels(self, index: int) -> dict[str, str]:
+        labels: dict[str, str] = {}
+        for name, position in self.positions(index).items():
+            label = _label(self.parameters[name][position])
+            if label is None:
+                label = f"{name}[{position}]"
+            labels[name] = label
+        return labels
+
+    def create_simulator(self, run: dict[str, any]) -> Simulator:
+        # Every run works on its own copies, so runs can not influence each other
+        arguments = copy.deepcopy({name: value for name, value in run.items() if name in _simulator_parameters})
+        topology = arguments["topology"]
+        if isinstance(topology, DefaultTopologies):
+            topology = copy.deepcopy(topology.topology_object)
+        if "scheduler" in run.keys() or "reliability" in run.keys():
+            edges = topology.edges
+            for (source, target), config in list(edges.items()):
+                if source == target:
+                    continue
+                edges[(source, target)] = EdgeConfig(
+                    scheduler=run.get("scheduler", config.scheduler),
+                    direction=config.direction,
+                    reliability=run.get("reliability", config.reliability)
+                )
+        arguments["topology"] = topology
+        return Simulator(**arguments)
+
+    def run_single(self, index: int) -> dict[str, any]:
+        simulator = self.create_simulator(self.run_parameters(index))
+        result = simulator.run(max_steps=self.max_steps, max_time=self.max_time)
+        final_colors: dict[str, str] = {}
+        for address, states in simulator.states.items():
+            color = states[-1].color
+            if isinstance(color, DefaultColors):
+                color = color.value
+            final_colors[str(address)] = str(color)
+        row: dict[str, any] = {"run": index}
+        row.update(self.labels(index))
+        row.update({
+            "stop_reason": result.stop_reason.value,
+            "steps": result.steps,
+            "steps_to_quiescence": result.steps if result.stop_reason == StopReason.QUIESCENCE else None,
+            "time": result.time,
+            "sent_messages": result.sent_messages,
+            "lost_messages": result.lost_messages,
+            "final_colors": final_colors,
+        })
+        # Times can be NumPy integers if a scheduler returned one
+        return {name: _python_value(value) for name, value in row.items()}
+
+    def results(self) -> Iterator[dict[str, any]]:
+        # Rows are yielded in the order of the runs as soon as they are available. Every run only depends on
+        # its own parameters, so the results do not depend on how the runs are distributed over the processes.
+        global _active_sweep
+        count = len(self)
+        if self.processes == 1:
+            for index in range(count):
+                yield self.run_single(index)
+            return
+        _active_sweep = self
+        try:
+            with multiprocessing.get_context("fork").Pool(processes=self.processes) as pool:
+                for row in pool.imap(_run_index, range(count)):
+                    yield row
+        finally:
+            _active_sweep = None
+
+    def run(self, path: str | None = None) -> list[dict[str, any]]:
+        rows: list[dict[str, any]] = []
+        writer: csv.DictWriter | None = None
+        file = open(path, "w", newline="") if path is not None else None
+        try:
+            for row in self.results():
+                rows.append(row)
+                if file is None:
+                    continue
+                if writer is None:
+                    writer = csv.DictWriter(file, fieldnames=list(row.keys()))
+                    writer.writeheader()
+                writer.writerow(dict(row, final_colors=json.dumps(row["final_colors"], sort_keys=True)))
+                file.flush()
+        finally:
+            if file is not None:
+                file.close()
+        return rows
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from enum import Enum
-from typing import Tuple
+from typing import Iterable, Tuple
 from DIAL.Scheduler import Scheduler, DefaultSchedulers
 
 
@@ -26,10 +26,18 @@ class Topology:
     edges: dict[Tuple[str, str], EdgeConfig]
     all_nodes_have_loops: bool
 
+    # Indices that are maintained by add_node and add_edge
+    _node_positions: dict[str, int]
+    _successors: dict[str, dict[str, None]]
+    _predecessors: dict[str, dict[str, None]]
+
     def __init__(self, nodes: list[str] = [], edges: list[Tuple[str, str, EdgeConfig]] = [], all_nodes_have_loops: bool = True, template: DefaultTopologies | None = None):
         self.nodes = []
         self.edges = {}
         self.all_nodes_have_loops = all_nodes_have_loops
+        self._node_positions = {}
+        self._successors = {}
+        self._predecessors = {}
 
         for node in nodes:
             self.add_node(node)
@@ -38,21 +46,32 @@ class Topology:
             self.add_edge(edge[0], edge[1], edge[2])
 
     def has_node(self, node: str) -> bool:
-        return node in self.nodes
+        return node in self._node_positions
+
+    def get_node_index(self, node: str) -> int | None:
+        # Position of the node in self.nodes
+        return self._node_positions.get(node)
 
     def has_edge(self, source: str, target: str):
         return (source, target) in self.edges.keys()
 
     def get_neighbors(self, node: str) -> list[str]:
-        neighbors: list[str] = []
-        for other in self.nodes:
-            if self.has_edge(source=node, target=other):
-                neighbors.append(other)
-        return neighbors
+        # Neighbors are returned in the order in which the nodes were added
+        if node not in self._successors:
+            return []
+        return sorted(self._successors[node].keys(), key=self._node_positions.__getitem__)
+
+    def get_predecessors(self, node: str) -> list[str]:
+        if node not in self._predecessors:
+            return []
+        return sorted(self._predecessors[node].keys(), key=self._node_positions.__getitem__)
 
     def add_node(self, node: str) -> bool:
-        if node in self.nodes:
+        if node in self._node_positions:
             return False
+        self._node_positions[node] = len(self.nodes)
+        self._successors[node] = {}
+        self._predecessors[node] = {}
         self.nodes.append(node)
         if self.all_nodes_have_loops:
             self_edge_config = EdgeConfig(
@@ -76,12 +95,30 @@ class Topology:
         if self.has_edge(x, y):
             return False
         if config.direction == EdgeDirection.UNIDIRECTIONAL:
-            self.edges[(x, y)] = config
+            self._set_edge(x, y, config)
         if config.direction == EdgeDirection.BIDIRECTIONAL:
-            self.edges[(x, y)] = config
-            self.edges[(y, x)] = config
+            self._set_edge(x, y, config)
+            self._set_edge(y, x, config)
         return True
 
+    def add_edges(self, edges: Iterable[Tuple[str, str]], config: EdgeConfig) -> int:
+        # Same as calling add_edge for every pair, but faster for large topologies. Returns the number of added edges.
+        bidirectional = config.direction == EdgeDirection.BIDIRECTIONAL
+        added = 0
+        for x, y in edges:
+            if x not in self._node_positions or y not in self._node_positions or (x, y) in self.edges:
+                continue
+            self._set_edge(x, y, config)
+            if bidirectional:
+                self._set_edge(y, x, config)
+            added += 1
+        return added
+
+    def _set_edge(self, source: str, target: str, config: EdgeConfig):
+        self.edges[(source, target)] = config
+        self._successors[source][target] = None
+        self._predecessors[target][source] = None
+
 
 class DefaultTopologies(Enum):
     RING_BIDIRECTIONAL = 0,
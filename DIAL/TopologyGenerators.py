@@ -0,0 +1,218 @@
+import numpy
+
+from DIAL.Scheduler import DefaultSchedulers
+from DIAL.Topology import Topology, EdgeConfig, EdgeDirection
+
+# Generators for large topologies. Nodes are named "0" to "n-1". Every generator sorts its edges into edge classes
+# and the edge_config argument can either be a single EdgeConfig for all edges or a dict with one EdgeConfig per class.
+
+EdgeArrays = tuple[numpy.ndarray, numpy.ndarray]
+
+
+def _random_generator(random_generator: numpy.random.Generator | int | None) -> numpy.random.Generator:
+    if isinstance(random_generator, numpy.random.Generator):
+        return random_generator
+    return numpy.random.default_rng(random_generator)
+
+
+def _edge_configs(edge_config: EdgeConfig | dict[str, EdgeConfig] | None, edge_classes: list[str]) -> dict[str, EdgeConfig]:
+    if edge_config is None:
+        edge_config = EdgeConfig(
+            reliability=1.0,
+            direction=EdgeDirection.BIDIRECTIONAL,
+            scheduler=DefaultSchedulers.LOCAL_FIFO
+        )
+    if isinstance(edge_config, EdgeConfig):
+        return {edge_class: edge_config for edge_class in edge_classes}
+    for edge_class in edge_classes:
+        if edge_class not in edge_config.keys():
+            print(f"Error: No EdgeConfig for edge class '{edge_class}' supplied! Expected {edge_classes}.")
+            exit(1)
+    return edge_config
+
+
+def _build(nodes: int, edges: dict[str, EdgeArrays], edge_config: EdgeConfig | dict[str, EdgeConfig] | None,
+           all_nodes_have_loops: bool) -> Topology:
+    configs = _edge_configs(edge_config, list(edges.keys()))
+    topology = Topology(all_nodes_have_loops=all_nodes_have_loops)
+    names = [str(node) for node in range(nodes)]
+    for name in names:
+        topology.add_node(name)
+    for edge_class, (sources, targets) in edges.items():
+        pairs = ((names[source], names[target]) for source, target in zip(sources.tolist(), targets.tolist()))
+        topology.add_edges(pairs, configs[edge_class])
+    return topology
+
+
+def _duplicates(low: numpy.ndarray, high: numpy.ndarray, nodes: int) -> numpy.ndarray:
+    # Marks every edge that is a self-loop or occurred before
+    keys = low.astype(numpy.int64) * nodes + high
+    _, first = numpy.unique(keys, return_index=True)
+    duplicate = numpy.ones(len(keys), dtype=bool)
+    duplicate[first] = False
+    return duplicate | (low == high)
+
+
+def grid(rows: int, columns: int, edge_config: EdgeConfig | dict[str, EdgeConfig] | None = None,
+         all_nodes_have_loops: bool = True) -> Topology:
+    # Edge classes: "horizontal", "vertical". Node "i" is located in row i // columns and column i % columns.
+    index = numpy.arange(rows * columns).reshape(rows, columns)
+    edges: dict[str, EdgeArrays] = {
+        "horizontal": (index[:, :-1].ravel(), index[:, 1:].ravel()),
+        "vertical": (index[:-1, :].ravel(), index[1:, :].ravel()),
+    }
+    return _build(rows * columns, edges, edge_config, all_nodes_have_loops)
+
+
+def torus(rows: int, columns: int, edge_config: EdgeConfig | dict[str, EdgeConfig] | None = None,
+          all_nodes_have_loops: bool = True) -> Topology:
+    # Edge classes: "horizontal", "vertical", "wrap". A grid whose borders are connected by the wrap edges.
+    index = numpy.arange(rows * columns).reshape(rows, columns)
+    wrap_sources: list[numpy.ndarray] = []
+    wrap_targets: list[numpy.ndarray] = []
+    # With two or fewer nodes in a row or column the wrap edge would duplicate an existing edge
+    if columns > 2:
+        wrap_sources.append(index[:, -1])
+        wrap_targets.append(index[:, 0])
+    if rows > 2:
+        wrap_sources.append(index[-1, :])
+        wrap_targets.append(index[0, :])
+    edges: dict[str, EdgeArrays] = {
+        "horizontal": (index[:, :-1].ravel(), index[:, 1:].ravel()),
+        "vertical": (index[:-1, :].ravel(), index[1:, :].ravel()),
+        "wrap": (numpy.concatenate(wrap_sources + [numpy.empty(0, dtype=int)]),
+                 numpy.concatenate(wrap_targets + [numpy.empty(0, dtype=int)])),
+    }
+    return _build(rows * columns, edges, edge_config, all_nodes_have_loops)
+
+
+def random_regular(nodes: int, degree: int, edge_config: EdgeConfig | dict[str, EdgeConfig] | None = None,
+                   random_generator: numpy.random.Generator | int | None = 0, all_nodes_have_loops: bool = True,
+                   max_attempts: int = 1000) -> Topology:
+    # Edge classes: "edge". Every node has exactly degree neighbors.
+    if degree < 0 or degree >= nodes or (nodes * degree) % 2 != 0:
+        print("Error: A random regular topology requires 0 <= degree < nodes and an even number of nodes * degree!")
+        exit(1)
+    rng = _random_generator(random_generator)
+    # Randomly pair the stubs of all nodes. Self-loops and duplicate edges are repaired by shuffling their stubs
+    # together with the stubs of some randomly selected valid edges.
+    stubs = numpy.repeat(numpy.arange(nodes), degree)
+    rng.shuffle(stubs)
+    pairs = stubs.reshape(-1, 2)
+    for _ in range(max_attempts):
+        low = pairs.min(axis=1)
+        high = pairs.max(axis=1)
+        invalid = _duplicates(low, high, nodes)
+        invalid_indices = numpy.flatnonzero(invalid)
+        if len(invalid_indices) == 0:
+            return _build(nodes, {"edge": (low, high)}, edge_config, all_nodes_have_loops)
+        valid_indices = numpy.flatnonzero(~invalid)
+        if len(valid_indices) > 0:
+            selected = numpy.unique(valid_indices[rng.integers(0, len(valid_indices), size=len(invalid_indices))])
+            invalid_indices = numpy.concatenate([invalid_indices, selected])
+        stubs = pairs[invalid_indices].ravel()
+        rng.shuffle(stubs)
+        pairs[invalid_indices] = stubs.reshape(-1, 2)
+    print(f"Error: Could not generate a random regular topology within {max_attempts} attempts!")
+    exit(1)
+
+
+def erdos_renyi(nodes: int, probability: float, edge_config: EdgeConfig | dict[str, EdgeConfig] | None = None,
+                random_generator: numpy.random.Generator | int | None = 0,
+                all_nodes_have_loops: bool = True) -> Topology:
+    # Edge classes: "edge". Every pair of nodes is connected with the given probability.
+    if probability < 0 or probability > 1:
+        print("Error: The probability of an Erdős–Rényi topology must be between 0 and 1!")
+        exit(1)
+    rng = _random_generator(random_generator)
+    # Instead of drawing a number for each of the n * (n - 1) / 2 pairs, the number of edges is drawn first.
+    # Then that many distinct pairs are sampled by their index.
+    pair_count = nodes * (nodes - 1) // 2
+    edge_count = int(rng.binomial(pair_count, probability)) if pair_count > 0 else 0
+    keys = numpy.empty(0, dtype=numpy.int64)
+    while len(keys) < edge_count:
+        missing = edge_count - len(keys)
+        draws = rng.integers(0, pair_count, size=missing + missing // 100 + 16, dtype=numpy.int64)
+        keys = numpy.unique(numpy.concatenate([keys, draws]))
+    keys = numpy.sort(rng.permutation(keys)[:edge_count])
+    # Pair index k belongs to the pair (i, j) with j < i and k = i * (i - 1) / 2 + j
+    high = numpy.floor((1 + numpy.sqrt(1 + 8 * keys.astype(numpy.float64))) / 2).astype(numpy.int64)
+    high -= (high * (high - 1) // 2) > keys
+    high += ((high + 1) * high // 2) <= keys
+    low = keys - high * (high - 1) // 2
+    return _build(nodes, {"edge": (low, high)}, edge_config, all_nodes_have_loops)
+
+
+def watts_strogatz(nodes: int, neighbors: int, rewire_probability: float,
+                   edge_config: EdgeConfig | dict[str, EdgeConfig] | None = None,
+                   random_generator: numpy.random.Generator | int | None = 0, all_nodes_have_loops: bool = True,
+                   max_attempts: int = 1000) -> Topology:
+    # Edge classes: "lattice", "shortcut". A ring in which every node is connected to its neighbors / 2 closest nodes
+    # on each side. Every edge is replaced by a shortcut to a random node with the given probability.
+    if neighbors % 2 != 0 or neighbors < 0 or neighbors >= nodes - 1:
+        print("Error: A Watts–Strogatz topology requires an even number of neighbors that is smaller than nodes - 1!")
+        exit(1)
+    rng = _random_generator(random_generator)
+    half = neighbors // 2
+    sources = numpy.repeat(numpy.arange(nodes), half)
+    targets = (sources + numpy.tile(numpy.arange(1, half + 1), nodes)) % nodes
+    rewired = rng.random(len(sources)) < rewire_probability
+    lattice_indices = numpy.flatnonzero(~rewired)
+    shortcut_indices = numpy.flatnonzero(rewired)
+    pending = shortcut_indices
+    attempts = 0
+    while len(pending) > 0:
+        if attempts == max_attempts:
+            print(f"Error: Could not generate a Watts–Strogatz topology within {max_attempts} attempts!")
+            exit(1)
+        attempts += 1
+        targets[pending] = rng.integers(0, nodes, size=len(pending))
+        # Lattice edges come first so only shortcuts can be marked as duplicates
+        order = numpy.concatenate([lattice_indices, shortcut_indices])
+        low = numpy.minimum(sources[order], targets[order])
+        high = numpy.maximum(sources[order], targets[order])
+        pending = order[_duplicates(low, high, nodes)]
+    edges: dict[str, EdgeArrays] = {
+        "lattice": (sources[lattice_indices], targets[lattice_indices]),
+        "shortcut": (sources[shortcut_indices], targets[shortcut_indices]),
+    }
+    return _build(nodes, edges, edge_config, all_nodes_have_loops)
+
+
+def barabasi_albert(nodes: int, attachments: int, edge_config: EdgeConfig | dict[str, EdgeConfig] | None = None,
+                    random_generator: numpy.random.Generator | int | None = 0,
+                    all_nodes_have_loops: bool = True) -> Topology:
+    # Edge classes: "seed", "attachment". Starts with a complete graph of attachments + 1 nodes. Every further node is
+    # connected to attachments distinct existing nodes that are chosen with a probability proportional to their degree.
+    if attachments < 1 or attachments >= nodes:
+        print("Error: A Barabási–Albert topology requires 1 <= attachments < nodes!")
+        exit(1)
+    rng = _random_generator(random_generator)
+    seed_sources, seed_targets = numpy.triu_indices(attachments + 1, k=1)
+    # Every node appears in this list once per incident edge, so a uniform choice from it is proportional to degree
+    endpoints: list[int] = numpy.concatenate([seed_sources, seed_targets]).tolist()
+    sources: list[int] = []
+    targets: list[int] = []
+    draws: list[float] = []
+    position = 0
+    for node in range(attachments + 1, nodes):
+        chosen: list[int] = []
+        while len(chosen) < attachments:
+            if position == len(draws):
+                # Random numbers are drawn in batches
+                draws = rng.random(65536).tolist()
+                position = 0
+            target = endpoints[int(draws[position] * len(endpoints))]
+            position += 1
+            if target not in chosen:
+                chosen.append(target)
+        for target in chosen:
+            sources.append(node)
+            targets.append(target)
+            endpoints.append(node)
+            endpoints.append(target)
+    edges: dict[str, EdgeArrays] = {
+        "seed": (seed_sources, seed_targets),
+        "attachment": (numpy.array(sources, dtype=int), numpy.array(targets, dtype=int)),
+    }
+    return _build(nodes, edges, edge_config, all_nodes_have_loops)
@@ -0,0 +1,211 @@
+import io
+import pickle
+import struct
+import zlib
+from copy import deepcopy
+from typing import Iterator
+
+from DIAL.Message import Message, reserve_message_ids
+from DIAL.RandomGenerator import pack_random_state, restore_random_state
+from DIAL.Simulator import Algorithm, ConditionHook, Simulator
+from DIAL.State import State
+from DIAL.Topology import Topology, DefaultTopologies
+
+# A trace log starts with a magic number followed by chunks. Every chunk consists of a header with the number of
+# records and the length of the compressed data, followed by the zlib compressed pickles of its records.
+# The first record holds the simulator at the time the writer was attached, every further record one step or undo.
+_magic: bytes = b"DIALTRACE\x02"
+_chunk_header: struct.Struct = struct.Struct("<II")
+_missing: object = object()
+
+
+def _state_delta(previous: State, state: State) -> tuple | None:
+    # Only values that are not shared with the previous version are stored
+    if state is previous:
+        return None
+    data = {key: value for key, value in state.data.items() if dict.get(previous.data, key, _missing) is not value}
+    removed = [key for key in previous.data.keys() if key not in state.data]
+    neighbors = None if state.neighbors is previous.neighbors else state.neighbors
+    random_state = None
+    if not state._random_number_generator_is_shared:
+        random_state = pack_random_state(state._random_number_generator)
+    # Attributes set by an algorithm are stored all together whenever one of them is not shared anymore
+    attributes = state._extra_attributes()
+    previous_attributes = previous._extra_attributes()
+    attributes_changed = any(previous_attributes.get(name, _missing) is not value for name, value in attributes.items())
+    if not attributes_changed and len(attributes) == len(previous_attributes):
+        attributes = None
+    return state.color, neighbors, data, removed, random_state, attributes
+
+
+def _apply_delta(previous: State, delta: tuple | None) -> State:
+    if delta is None:
+        return previous
+    color, neighbors, data, removed, random_state, attributes = delta
+    state = State.__new__(State)
+    state.__dict__.update(previous._extra_attributes() if attributes is None else attributes)
+    state.address = previous.address
+    state.color = color
+    state.neighbors = previous.neighbors if neighbors is None else neighbors
+    state.data = dict(previous.data)
+    state.data.update(data)
+    for key in removed:
+        del state.data[key]
+    if random_state is None:
+        state._random_number_generator = previous._random_number_generator
+        state._random_number_generator_is_shared = True
+    else:
+        state._random_number_generator = deepcopy(previous._random_number_generator)
+        restore_random_state(state._random_number_generator, random_state)
+        state._random_number_generator_is_shared = False
+    return state
+
+
+class TraceWriter:
+    # Streams every step of a simulator to a compressed log file, so that the run can be loaded again with
+    # load_trace without executing the algorithms. Records are collected into chunks of chunk_size records.
+    # If the process crashes, only the records of the unfinished chunk are lost.
+    # Changes that are made through the API instead of by steps are not recorded.
+    path: str
+    chunk_size: int
+    compression_level: int
+    steps: int
+
+    _simulator: Simulator | None
+    _file: io.BufferedWriter | None
+    _records: list[bytes]
+
+    def __init__(self, simulator: Simulator, path: str, chunk_size: int = 1000, compression_level: int = 6):
+        if simulator.trace_writer is not None:
+            print("Error: The simulator is already recorded by another TraceWriter!")
+            exit(1)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.compression_level = compression_level
+        self.steps = 0
+        self._records = []
+        self._file = open(path, "wb")
+        self._file.write(_magic)
+        base = simulator.__getstate__()
+        # Functions are supplied again when the trace is loaded
+        for name in ["topology", "algorithms", "condition_hooks"]:
+            del base[name]
+        self._records.append(pickle.dumps(("base", base), protocol=pickle.HIGHEST_PROTOCOL))
+        self.flush()
+        self._simulator = simulator
+        simulator.trace_writer = self
+
+    def __enter__(self) -> 'TraceWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _append(self, record: tuple):
+        # Records are pickled right away, because the messages and states might still change later on
+        self._records.append(pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL))
+        self.steps += 1
+        if len(self._records) >= self.chunk_size:
+            self.flush()
+
+    def write_step(self, simulator: Simulator, current_state: State, new_state: State, new_messages: list[Message],
+                   random_state: int | dict[str, any] | None):
+        created_state = current_state if simulator.journal[-1].created_state else None
+        random_state_after = None
+        if random_state is not None:
+            random_state_after = pack_random_state(simulator.random_generator)
+        self._append(("step", simulator.time, simulator.theta, created_state, _state_delta(current_state, new_state),
+                      new_messages, random_state, random_state_after))
+
+    def write_undo(self):
+        self._append(("undo",))
+
+    def flush(self):
+        if self._file is None or len(self._records) == 0:
+            return
+        data = zlib.compress(b"".join(self._records), self.compression_level)
+        self._file.write(_chunk_header.pack(len(self._records), len(data)))
+        self._file.write(data)
+        self._file.flush()
+        self._records = []
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._simulator is not None and self._simulator.trace_writer is self:
+            self._simulator.trace_writer = None
+        self._simulator = None
+
+
+def read_trace(path: str) -> Iterator[tuple]:
+    # Yields the records of a trace log. Chunks are only read and decompressed once they are reached.
+    with open(path, "rb") as file:
+        if file.read(len(_magic)) != _magic:
+            print(f"Error: '{path}' is not a trace log!")
+            exit(1)
+        while True:
+            header = file.read(_chunk_header.size)
+            if len(header) < _chunk_header.size:
+                return
+            count, length = _chunk_header.unpack(header)
+            data = file.read(length)
+            if len(data) < length:
+                # The last chunk was not written completely
+                return
+            stream = io.BytesIO(zlib.decompress(data))
+            for _ in range(count):
+                # Every record is a pickle of its own and needs a new memo
+                yield pickle.load(stream)
+
+
+def _replay_step(simulator: Simulator, record: tuple):
+    _, time, theta, created_state, delta, new_messages, random_state, random_state_after = record
+    simulator.time = time
+    simulator.theta = theta
+    simulator.messages.set_cursor(time, theta)
+    current_message = simulator.messages[time][theta]
+    if created_state is not None:
+        simulator._add_state(created_state)
+    current_state = simulator.states[current_message.target_address][-1]
+    new_state = _apply_delta(current_state, delta)
+    simulator.states[current_message.target_address].append(new_state)
+    current_message._child_messages = [msg._id for msg in new_messages]
+    # During a step messages are only appended to their time slot, so inserting them in the order they were sent
+    # restores their positions as well as the order in which the time slots were created
+    for msg in new_messages:
+        simulator.messages.insert(msg, msg._arrival_time, msg._arrival_theta)
+    simulator._record_step(current_message, current_state, new_state, new_messages, random_state,
+                           created_state is not None)
+    if random_state_after is not None:
+        restore_random_state(simulator.random_generator, random_state_after)
+
+
+def load_trace(path: str, topology: Topology | DefaultTopologies, algorithms: dict[str, Algorithm],
+               condition_hooks: list[ConditionHook] = [], steps: int | None = None) -> Simulator:
+    # Restores the simulator of a trace log right after the given number of executed steps (all by default).
+    # Records of undone steps are replayed but not counted.
+    # The algorithms are not executed, they are only needed to continue the simulation afterwards.
+    records = read_trace(path)
+    base = next(records, None)
+    if base is None or base[0] != "base":
+        print(f"Error: The trace log '{path}' is empty!")
+        exit(1)
+    state = base[1]
+    state["topology"] = topology.topology_object if isinstance(topology, DefaultTopologies) else topology
+    state["algorithms"] = algorithms
+    state["condition_hooks"] = condition_hooks
+    simulator = Simulator.__new__(Simulator)
+    simulator.__setstate__(state)
+    replayed_steps = 0
+    for record in records:
+        if steps is not None and replayed_steps >= steps:
+            break
+        if record[0] == "step":
+            _replay_step(simulator, record)
+            replayed_steps += 1
+        else:
+            simulator._undo_step()
+    reserve_message_ids(max(simulator.messages.message_ids(), default=0))
+    return simulator
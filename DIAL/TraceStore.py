@@ -0,0 +1,73 @@
+from array import array
+
+import numpy
+
+from DIAL.Message import Message
+
+# Every column of the trace and the typecode of the array it is stored in
+_columns: dict[str, str] = {
+    "id": "q",               # -1 for IDs that do not fit into 64 bits
+    "parent": "q",           # -1 for messages without a parent
+    "source": "i",           # Index of the node in topology.nodes or -1 if it is not part of the topology
+    "target": "i",
+    "creation_time": "q",
+    "creation_theta": "q",
+    "arrival_time": "q",
+    "arrival_theta": "q",
+    "children": "i",         # Number of messages that were sent in response to the message
+    "is_lost": "b",
+    "is_self_message": "b",
+}
+
+_max_id: int = 2 ** 63 - 1
+
+
+def _trace_id(message_id: int | None) -> int:
+    if message_id is None or message_id > _max_id:
+        return -1
+    return message_id
+
+
+class TraceStore:
+    # Append-only columnar record of every received message. Row i belongs to the i-th step of the simulation.
+    # The columns are typed arrays, so recording a step does not keep any Python objects alive and the whole
+    # history can be turned into NumPy arrays at once.
+    _columns: dict[str, array]
+
+    def __init__(self):
+        self._columns = {name: array(typecode) for name, typecode in _columns.items()}
+
+    def __len__(self) -> int:
+        return len(self._columns["id"])
+
+    def append(self, message: Message, source: int | None, target: int | None):
+        columns = self._columns
+        columns["id"].append(_trace_id(message._id))
+        columns["parent"].append(_trace_id(message._parent_message))
+        columns["source"].append(-1 if source is None else source)
+        columns["target"].append(-1 if target is None else target)
+        columns["creation_time"].append(message._creation_time)
+        columns["creation_theta"].append(message._creation_theta)
+        columns["arrival_time"].append(message._arrival_time)
+        columns["arrival_theta"].append(message._arrival_theta)
+        columns["children"].append(len(message._child_messages))
+        columns["is_lost"].append(message._is_lost)
+        columns["is_self_message"].append(message._is_self_message)
+
+    def extend(self, arrays: dict[str, numpy.ndarray]):
+        # Appends rows that were returned by arrays()
+        for name, column in self._columns.items():
+            column.frombytes(numpy.asarray(arrays[name]).astype(column.typecode).tobytes())
+
+    def pop(self):
+        # Removes the latest row when a step is undone
+        for column in self._columns.values():
+            column.pop()
+
+    def arrays(self) -> dict[str, numpy.ndarray]:
+        # Copies of the columns, so they stay valid while the simulation goes on
+        result: dict[str, numpy.ndarray] = {}
+        for name, column in self._columns.items():
+            values = numpy.frombuffer(column, dtype=column.typecode) if len(column) > 0 else numpy.empty(0, dtype=column.typecode)
+            result[name] = values.astype(bool) if column.typecode == "b" else values.copy()
+        return result
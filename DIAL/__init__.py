@@ -1,10 +1,16 @@
 from DIAL.Address import Address
+from DIAL.BinaryPayload import BinaryPayload
 from DIAL.Color import Color, DefaultColors
 from DIAL.Topology import Topology, DefaultTopologies, EdgeConfig, EdgeDirection
+from DIAL import TopologyGenerators
 from DIAL.Error import Error
 from DIAL.Message import Message
+from DIAL.MessageQueue import MessageQueue, QueueBackend
 from DIAL.ReadOnlyDict import ReadOnlyDict
-from DIAL.Scheduler import Scheduler, DefaultSchedulers
-from DIAL.Simulator import Algorithm, ConditionHook, Simulator, send, send_to_self, get_global_time, get_local_states
+from DIAL.Scheduler import Scheduler, DefaultSchedulers, IncrementalScheduler, QueueView, incremental_scheduler
+from DIAL.Simulator import Algorithm, ConditionHook, Simulator, RunResult, SeekResult, StopReason, send, send_to_self, get_global_time, get_local_states
+from DIAL.Snapshot import save_snapshot, load_snapshot
+from DIAL.Sweep import Sweep
+from DIAL.TraceLog import TraceWriter, load_trace
 from DIAL.State import State
 from DIAL.API.API import API
@@ -4,7 +4,7 @@ def infinite_states(state: State, message: Message) -> None:
     state.color = DefaultColors.PINK
     msg = message.copy()
     instance_addr = int(msg.target_address.instance)
-    msg.target_address.instance = str(instance_addr + 1)
+    msg.target_address = msg.target_address.copy(instance=str(instance_addr + 1))
     send_to_self(msg, 1)
 
 
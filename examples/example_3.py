@@ -40,7 +40,7 @@ def modify_election_hook(state: State, message: Message, messages: list[Message]
         return
     for message in messages:
         if message.target_address.algorithm == "flooding":
-            message.target_address.algorithm = "exclusion"
+            message.target_address = message.target_address.copy(algorithm="exclusion")
 
 
 initial_message_1 = Message(
@@ -21,7 +21,7 @@ def benchmark_algorithm(state: State, message: Message) -> None:
             m = message.copy()
             m.data["hop_count"] -= 1
             m.target_address = Address(node_name=next_neighbor(), algorithm="benchmark", instance="instance")
-            m.source_address.node_name = state.address.node_name
+            m.source_address = m.source_address.copy(node=state.address.node_name)
             send(m)
 
     # Get local states
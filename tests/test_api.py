@@ -0,0 +1,85 @@
+import json
+
+from flask import Flask
+
+from DIAL import *
+from DIAL.API.BinaryEndpoints import BinaryEndpoints
+from DIAL.API.ControlEndpoints import ControlEndpoints
+from DIAL.API.MessageEndpoints import MessageEndpoints
+from DIAL.API.StateEndpoints import StateEndpoints
+
+
+def idle_algorithm(state: State, message: Message) -> None:
+    pass
+
+
+def create_api(simulator: Simulator) -> API:
+    # The endpoints without the server process that API.__init__ starts
+    api = API.__new__(API)
+    api.simulator = simulator
+    api.api = Flask(__name__)
+    api.initial_snapshot = None
+    api.initial_simulator = None
+    api.initial_journal_length = len(simulator.journal)
+    api.modified = False
+    api.control_endpoint = ControlEndpoints(api=api)
+    api.message_endpoint = MessageEndpoints(api=api)
+    api.state_endpoint = StateEndpoints(api=api)
+    api.binary_endpoint = BinaryEndpoints(api=api)
+    return api
+
+
+def test_put_message_updates_the_payload_in_place():
+    message = Message(source_address="A/alg/instance", target_address="A/alg/instance", data={"old": 1})
+    simulator = Simulator(
+        topology=Topology(["A"], [], all_nodes_have_loops=True),
+        algorithms={"alg": idle_algorithm},
+        initial_messages={1: [message]}
+    )
+    api = create_api(simulator)
+    payload = message.data
+    body = message.to_json()
+    body["data"] = {"new": 2}
+    with api.api.test_request_context(json=body):
+        response = api.message_endpoint.put_message(body["id"])
+    assert response.status_code == 200
+    assert json.loads(response.get_data())["data"] == {"new": 2}
+    assert message.data is payload
+    assert payload == {"new": 2}
+
+
+def test_get_binary_returns_the_raw_bytes():
+    payload = BinaryPayload(b"raw bytes")
+    message = Message(source_address="A/alg/instance", target_address="A/alg/instance", data={"payload": payload})
+    simulator = Simulator(
+        topology=Topology(["A"], [], all_nodes_have_loops=True),
+        algorithms={"alg": idle_algorithm},
+        initial_messages={1: [message]}
+    )
+    api = create_api(simulator)
+    with api.api.test_request_context():
+        response = api.message_endpoint.get_message(message.summary()["id"])
+        digest = json.loads(response.get_data())["data"]["payload"]["binary"]
+        response = api.binary_endpoint.get_binary(digest)
+        assert (response.status_code, response.mimetype) == (200, "application/octet-stream")
+        assert response.get_data() == b"raw bytes"
+        assert api.binary_endpoint.get_binary("0" * 64).status_code == 404
+
+
+def test_get_seek_moves_the_simulator():
+    message = Message(source_address="A/alg/instance", target_address="A/alg/instance")
+    later_message = Message(source_address="A/alg/instance", target_address="A/alg/other")
+    simulator = Simulator(
+        topology=Topology(["A"], [], all_nodes_have_loops=True),
+        algorithms={"alg": idle_algorithm},
+        initial_messages={1: [message], 5: [later_message]}
+    )
+    api = create_api(simulator)
+    with api.api.test_request_context():
+        response = json.loads(api.control_endpoint.get_seek("7", "0").get_data())
+        assert (response["time"], response["theta"], response["steps"], response["reached"]) == (5, 0, 2, True)
+        assert set(response["states"].keys()) == {"A/alg/instance", "A/alg/other"}
+        response = json.loads(api.control_endpoint.get_seek("1", "0").get_data())
+        assert (response["time"], response["theta"], response["steps"]) == (1, 0, -1)
+        assert response["states"] == {"A/alg/other": None}
+        assert api.control_endpoint.get_seek("one", "0").status_code == 300
@@ -0,0 +1,36 @@
+import copy
+import pickle
+
+import numpy
+import pytest
+
+from DIAL import *
+from DIAL.BinaryPayload import decode_binary_payloads, encode_binary_payloads
+
+
+def test_payloads_are_deduplicated_by_content():
+    array = numpy.arange(12, dtype=numpy.int32).reshape(3, 4)
+    payload = BinaryPayload(array)
+    assert BinaryPayload(array.copy()) is payload
+    assert BinaryPayload(payload) is payload
+    assert copy.deepcopy(payload) is payload
+    assert pickle.loads(pickle.dumps(payload)) is payload
+    # The same bytes with another dtype or shape are different content
+    assert BinaryPayload(array.reshape(4, 3)) is not payload
+    assert BinaryPayload(array.tobytes()) is not payload
+    assert BinaryPayload.get(payload.digest) is payload
+    numpy.testing.assert_array_equal(payload.array(), array)
+    assert not payload.array().flags.writeable
+    with pytest.raises(AttributeError):
+        payload.dtype = None
+
+
+def test_payloads_are_encoded_as_descriptors():
+    payload = BinaryPayload(b"\x00\x01\x02")
+    data = {"payload": payload, "nested": [payload], "array": numpy.zeros(2, dtype=numpy.uint8), "number": 1}
+    encoded = encode_binary_payloads(data)
+    assert encoded["payload"] == {"binary": payload.digest, "dtype": None, "shape": [3], "size": 3}
+    assert encoded["array"] == {"dtype": "|u1", "shape": [2], "size": 2}
+    decoded = decode_binary_payloads(encoded)
+    assert decoded["payload"] is payload and decoded["nested"][0] is payload
+    assert decoded["number"] == 1
@@ -0,0 +1,63 @@
+import pytest
+
+from DIAL import *
+from DIAL.FrozenData import FrozenDict, FrozenList, freeze
+
+
+def flooding_algorithm(state: State, message: Message) -> None:
+    if state.color == message.color:
+        return
+    state.color = message.color
+    state.data["payload_size"] = len(message.data["payload"])
+    for neighbor in state.neighbors:
+        if neighbor == state.address.node_name:
+            continue
+        m = message.copy()
+        m.source_address = state.address
+        m.target_address = state.address.copy(node=neighbor)
+        send(m)
+
+
+def mutating_algorithm(state: State, message: Message) -> None:
+    message.data["payload"].append(1)
+
+
+def create_simulator(frozen_payloads: bool, algorithm=flooding_algorithm) -> Simulator:
+    edge_config = EdgeConfig(DefaultSchedulers.RANDOM, EdgeDirection.BIDIRECTIONAL)
+    nodes = [str(node) for node in range(6)]
+    edges = [(nodes[node], nodes[(node + 1) % 6], edge_config) for node in range(6)]
+    edges += [(nodes[node], nodes[(node + 2) % 6], edge_config) for node in range(6)]
+    initial_message = Message(source_address="0/flooding/red", target_address="0/flooding/red",
+                              color=DefaultColors.RED, data={"payload": list(range(1000))})
+    return Simulator(topology=Topology(nodes, edges), algorithms={"flooding": algorithm},
+                     initial_messages={1: [initial_message]}, frozen_payloads=frozen_payloads)
+
+
+def test_frozen_payloads_are_shared_and_do_not_change_the_result():
+    copied = create_simulator(frozen_payloads=False)
+    copied.run()
+    frozen = create_simulator(frozen_payloads=True)
+    frozen.run()
+    assert ([(entry.time, entry.theta, str(entry.address)) for entry in copied.journal] ==
+            [(entry.time, entry.theta, str(entry.address)) for entry in frozen.journal])
+    assert all(history[-1].data["payload_size"] == 1000 for history in frozen.states.values())
+    frozen_payloads = {id(message.data["payload"]) for time in frozen.messages.times() for message in frozen.messages[time]}
+    copied_payloads = {id(message.data["payload"]) for time in copied.messages.times() for message in copied.messages[time]}
+    assert len(frozen_payloads) == 1
+    assert len(copied_payloads) == copied.messages.message_count() > 1
+
+
+def test_frozen_payloads_can_not_be_modified():
+    simulator = create_simulator(frozen_payloads=True, algorithm=mutating_algorithm)
+    with pytest.raises(RuntimeError):
+        simulator.step_forward()
+
+
+def test_freeze_converts_nested_values():
+    frozen = freeze({"list": [1, [2]], "tuple": ([3],), "set": {4}})
+    assert type(frozen) is FrozenDict
+    assert type(frozen["list"]) is FrozenList and type(frozen["list"][1]) is FrozenList
+    assert type(frozen["tuple"][0]) is FrozenList
+    assert frozen["set"] == frozenset({4})
+    assert freeze(frozen) is frozen
+    assert frozen == {"list": [1, [2]], "tuple": ([3],), "set": {4}}
@@ -0,0 +1,50 @@
+import pickle
+from uuid import UUID
+
+import pytest
+
+from DIAL import *
+from DIAL.Message import message_id_to_string, reserve_message_ids
+
+
+def idle_algorithm(state: State, message: Message) -> None:
+    pass
+
+
+def create_message() -> Message:
+    return Message(source_address="A/alg/instance", target_address="A/alg/instance", data={"values": [1]})
+
+
+def test_messages_have_slots_and_sequential_ids():
+    first = create_message()
+    second = create_message()
+    copied = first.copy()
+    assert second._id > first._id
+    assert copied._id > second._id
+    assert copied.data == first.data and copied.data is not first.data
+    assert not hasattr(first, "__dict__")
+    with pytest.raises(AttributeError):
+        first.unknown = True
+
+
+def test_message_ids_are_rendered_as_uuids():
+    message = create_message()
+    simulator = Simulator(topology=Topology(["A"], [], all_nodes_have_loops=True), algorithms={"alg": idle_algorithm},
+                          initial_messages={1: [message]})
+    rendered = message.summary()["id"]
+    assert rendered == str(UUID(int=message._id)) == message_id_to_string(message._id)
+    assert message.title == rendered
+    for message_id in [rendered, UUID(rendered), message._id]:
+        assert simulator.get_message(message_id) is message
+    assert simulator.get_message("not an id") is None
+
+
+def test_loaded_message_ids_are_reserved():
+    message = create_message()
+    message._id = 2 ** 40
+    simulator = Simulator(topology=Topology(["A"], [], all_nodes_have_loops=True), algorithms={"alg": idle_algorithm},
+                          initial_messages={1: [message]})
+    pickle.loads(pickle.dumps(simulator))
+    assert create_message()._id > 2 ** 40
+    reserve_message_ids(2 ** 41)
+    assert create_message()._id > 2 ** 41
@@ -0,0 +1,74 @@
+import bisect
+import random
+
+from DIAL import *
+from DIAL.MessageQueue import CalendarTimeIndex, HeapTimeIndex, SortedTimeIndex
+
+
+def flooding_algorithm(state: State, message: Message) -> None:
+    if state.color == message.color:
+        return
+    state.color = message.color
+    for neighbor in state.neighbors:
+        if neighbor == state.address.node_name:
+            continue
+        m = message.copy()
+        m.source_address = state.address
+        m.target_address = state.address.copy(node=neighbor)
+        send(m)
+
+
+def test_time_indices_match_a_sorted_list():
+    randomness = random.Random(0)
+    for index in [HeapTimeIndex(), SortedTimeIndex(), CalendarTimeIndex()]:
+        reference: list[int] = []
+        for _ in range(2000):
+            time = randomness.randrange(0, 500)
+            operation = randomness.random()
+            if operation < 0.4:
+                index.add(time)
+                if time not in reference:
+                    bisect.insort(reference, time)
+            elif operation < 0.6:
+                index.remove(time)
+                if time in reference:
+                    reference.remove(time)
+            elif operation < 0.8:
+                position = bisect.bisect_right(reference, time)
+                assert index.next_time(time) == (reference[position] if position < len(reference) else None)
+            else:
+                position = bisect.bisect_left(reference, time)
+                assert index.previous_time(time) == (reference[position - 1] if position > 0 else None)
+        assert index.next_time(None) == (reference[0] if len(reference) > 0 else None)
+        assert index.times() == reference
+        assert len(index) == len(reference)
+
+
+def simulate(queue_backend: QueueBackend) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+    edge_config = EdgeConfig(DefaultSchedulers.RANDOM, EdgeDirection.BIDIRECTIONAL)
+    nodes = [str(node) for node in range(8)]
+    edges = [(nodes[node], nodes[(node + 1) % 8], edge_config) for node in range(8)]
+    edges += [(nodes[node], nodes[(node + 3) % 8], edge_config) for node in range(8)]
+    initial_messages = {
+        1: [Message(source_address="0/flooding/red", target_address="0/flooding/red", color=DefaultColors.RED)],
+        4: [Message(source_address="5/flooding/blue", target_address="5/flooding/blue", color=DefaultColors.BLUE)]
+    }
+    simulator = Simulator(topology=Topology(nodes, edges), algorithms={"flooding": flooding_algorithm},
+                          initial_messages=initial_messages, queue_backend=queue_backend)
+    forward: list[tuple[int, int]] = []
+    while (action := simulator.step_forward()) is not None:
+        forward.append((action["time"], action["theta"]))
+    backward: list[tuple[int, int]] = []
+    while (action := simulator.step_backward()) is not None:
+        backward.append((action["time"], action["theta"]))
+    assert simulator.messages.times() == [1, 4]
+    return forward, backward
+
+
+def test_queue_backends_step_through_the_same_positions():
+    forward, backward = simulate(QueueBackend.SORTED)
+    assert len(forward) > 10
+    # Stepping back visits the same positions in reverse and ends before the first message
+    assert backward == list(reversed(forward))[1:] + [(None, None)]
+    for queue_backend in [QueueBackend.HEAP, QueueBackend.CALENDAR]:
+        assert simulate(queue_backend) == (forward, backward)
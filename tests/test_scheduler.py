@@ -0,0 +1,104 @@
+import copy
+
+from DIAL import *
+from DIAL.Scheduler import local_fifo_scheduler
+
+
+def flooding_algorithm(state: State, message: Message) -> None:
+    if state.color == message.color:
+        return
+    state.color = message.color
+    for neighbor in state.neighbors:
+        if neighbor == state.address.node_name:
+            continue
+        m = message.copy()
+        m.source_address = state.address
+        m.target_address = state.address.copy(node=neighbor)
+        send(m)
+
+
+def create_simulator(scheduler: Scheduler | DefaultSchedulers, seed: int = 3) -> Simulator:
+    edge_config = EdgeConfig(scheduler, EdgeDirection.BIDIRECTIONAL)
+    nodes = [str(node) for node in range(6)]
+    edges = [(nodes[node], nodes[(node + 1) % 6], edge_config) for node in range(6)]
+    edges += [(nodes[node], nodes[(node + 2) % 6], edge_config) for node in range(6)]
+    initial_messages = {
+        1: [Message(source_address="0/flooding/red", target_address="0/flooding/red", color=DefaultColors.RED)],
+        2: [Message(source_address="3/flooding/blue", target_address="3/flooding/blue", color=DefaultColors.BLUE),
+            Message(source_address="1/flooding/green", target_address="1/flooding/green", color=DefaultColors.GREEN)]
+    }
+    return Simulator(topology=Topology(nodes, edges), algorithms={"flooding": flooding_algorithm},
+                     initial_messages=initial_messages, seed=seed)
+
+
+def test_local_fifo_index_matches_the_queue_scan():
+    calls: list[tuple[int, int]] = []
+
+    def checked_scheduler(topology, time, theta, message_queue, message, random_number_generator):
+        # The scan over a plain dict is the behaviour the per-edge index has to reproduce
+        scanned = local_fifo_scheduler(topology, time, theta, dict(message_queue), message,
+                                       copy.deepcopy(random_number_generator))
+        indexed = local_fifo_scheduler(topology, time, theta, message_queue, message, random_number_generator)
+        calls.append((indexed, scanned))
+        return indexed
+
+    simulator = create_simulator(checked_scheduler)
+    simulator.run(max_steps=15)
+    for _ in range(6):
+        simulator.step_backward()
+    simulator.run()
+    assert len(calls) > 20
+    assert all(indexed == scanned for indexed, scanned in calls)
+
+
+
+def backlog_scheduler(topology, time, theta, message_queue, message, random_number_generator) -> int:
+    # Delays a message by the number of messages that the target still has to process
+    backlog = 0
+    for time_index, messages in message_queue.items():
+        for theta_index, queued in enumerate(messages):
+            if (time_index, theta_index) > (time, theta) and queued.target_address.node_name == message.target_address.node_name:
+                backlog += 1
+    return time + 1 + backlog
+
+
+@incremental_scheduler
+def incremental_backlog_scheduler(topology, queue_view: QueueView, message, random_number_generator) -> int:
+    return queue_view.time + 1 + queue_view.backlog(message.target_address.node_name)
+
+
+def test_incremental_scheduler_matches_the_original_signature():
+    original = create_simulator(backlog_scheduler)
+    original.run()
+    incremental = create_simulator(incremental_backlog_scheduler)
+    incremental.run()
+    assert len(original.journal) == len(incremental.journal) > 10
+    assert ([(entry.time, entry.theta, str(entry.address)) for entry in original.journal] ==
+            [(entry.time, entry.theta, str(entry.address)) for entry in incremental.journal])
+
+
+def test_queue_view_matches_the_queue():
+    views: list[tuple] = []
+
+    @incremental_scheduler
+    def checking_scheduler(topology, queue_view: QueueView, message, random_number_generator) -> int:
+        queue = dict(queue_view._queue)
+        cursor = (queue_view.time, queue_view.theta)
+        after_cursor = [queued for time, messages in queue.items() for theta, queued in enumerate(messages)
+                        if (time, theta) > cursor]
+        views.append((
+            (queue_view.min_time(), queue_view.max_time(), queue_view.message_count(),
+             [queue_view.slot_size(time) for time in range(max(queue) + 2)],
+             queue_view.backlog(message.target_address.node_name)),
+            (min(queue), max(queue), sum(len(messages) for messages in queue.values()),
+             [len(queue.get(time, [])) for time in range(max(queue) + 2)],
+             sum(1 for queued in after_cursor if queued.target_address.node_name == message.target_address.node_name))
+        ))
+        return random_number_generator.integers(queue_view.time + 1, queue_view.time + 6)
+
+    simulator = create_simulator(checking_scheduler)
+    simulator.run(max_steps=10)
+    simulator.seek(simulator.journal[3].time, simulator.journal[3].theta)
+    simulator.run()
+    assert len(views) > 10
+    assert all(view == expected for view, expected in views)
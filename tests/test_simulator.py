@@ -0,0 +1,182 @@
+from DIAL import *
+
+
+def local_states_algorithm(state: State, message: Message) -> None:
+    first = get_local_states()
+    for local_state in first.values():
+        local_state.data["changed"] = True
+    second = get_local_states()
+    state.data["isolated"] = all("changed" not in local_state.data for local_state in second.values())
+
+
+def test_get_local_states_returns_copies_per_call():
+    initial_message = Message(source_address="A/alg/instance", target_address="A/alg/instance")
+    simulator = Simulator(
+        topology=Topology(["A"], [], all_nodes_have_loops=True),
+        algorithms={"alg": local_states_algorithm},
+        initial_messages={1: [initial_message]}
+    )
+    simulator.run()
+    state = simulator.states[Address.from_string("A/alg/instance")][-1]
+    assert state.data["isolated"] is True
+    assert "changed" not in simulator.states[Address.from_string("A/alg/instance")][0].data
+
+
+def reassigning_algorithm(state: State, message: Message) -> None:
+    global Color
+    state.data.setdefault("color_available", []).append(Color is not None)
+    Color = None
+    if len(state.data["color_available"]) < 2:
+        m = message.copy()
+        m.source_address = state.address
+        m.target_address = state.address
+        send_to_self(m, 1)
+
+
+def test_reassigned_globals_do_not_persist():
+    initial_message = Message(source_address="A/alg/instance", target_address="A/alg/instance")
+    simulator = Simulator(
+        topology=Topology(["A"], [], all_nodes_have_loops=True),
+        algorithms={"alg": reassigning_algorithm},
+        initial_messages={1: [initial_message]}
+    )
+    simulator.run()
+    state = simulator.states[Address.from_string("A/alg/instance")][-1]
+    assert state.data["color_available"] == [True, True]
+
+
+def two_delays_algorithm(state: State, message: Message) -> None:
+    if message.title != "start":
+        return
+    for delay in [20, 9]:
+        m = Message(source_address=state.address, target_address=state.address, title=f"delay {delay}")
+        send_to_self(m, delay)
+
+
+def test_step_backward_reports_deleted_messages_in_queue_order():
+    simulator = Simulator(
+        topology=Topology(["A"], [], all_nodes_have_loops=True),
+        algorithms={"alg": two_delays_algorithm},
+        initial_messages={
+            1: [Message(source_address="A/alg/instance", target_address="A/alg/instance", title="start")],
+            10: [Message(source_address="A/alg/instance", target_address="A/alg/instance", title="other")]
+        }
+    )
+    action = simulator.step_forward()
+    assert [message["title"] for message in action["produced_messages"]] == ["delay 20", "delay 9"]
+    action = simulator.step_backward()
+    # Time slot 10 existed before slot 21, so a scan over the queue visits its message first
+    assert [message["title"] for message in action["deleted_messages"]] == ["delay 9", "delay 20"]
+    assert simulator.messages.times() == [1, 10]
+
+
+def flooding_algorithm(state: State, message: Message) -> None:
+    if state.color == message.color:
+        return
+    state.color = message.color
+    for neighbor in state.neighbors:
+        if neighbor == state.address.node_name:
+            continue
+        m = message.copy()
+        m.source_address = state.address
+        m.target_address = state.address.copy(node=neighbor)
+        send(m)
+
+
+def create_flooding_simulator(reliability: float = 1.0, checkpoint_interval: int | None = None) -> Simulator:
+    edge_config = EdgeConfig(DefaultSchedulers.RANDOM, EdgeDirection.BIDIRECTIONAL, reliability=reliability)
+    nodes = [str(node) for node in range(6)]
+    edges = [(nodes[node], nodes[(node + 1) % 6], edge_config) for node in range(6)]
+    edges += [(nodes[node], nodes[(node + 2) % 6], edge_config) for node in range(6)]
+    initial_messages = {
+        1: [Message(source_address="0/flooding/red", target_address="0/flooding/red", color=DefaultColors.RED)],
+        3: [Message(source_address="3/flooding/blue", target_address="3/flooding/blue", color=DefaultColors.BLUE)]
+    }
+    return Simulator(topology=Topology(nodes, edges), algorithms={"flooding": flooding_algorithm},
+                     initial_messages=initial_messages, seed=7, checkpoint_interval=checkpoint_interval)
+
+
+def fingerprint(simulator: Simulator) -> tuple:
+    # Message IDs are counted globally, so they differ between simulators
+    id_keys = ["id", "title", "parent", "children"]
+    messages = {time: [{key: value for key, value in message.summary().items() if key not in id_keys}
+                       for message in simulator.messages[time]]
+                for time in simulator.messages.times()}
+    states = {str(address): (str(history[-1].color), history[-1].data, len(history))
+              for address, history in simulator.states.items()}
+    return simulator.time, simulator.theta, messages, states
+
+
+def test_run_matches_step_forward():
+    stepped = create_flooding_simulator(reliability=0.7)
+    sent_messages = 0
+    lost_messages = 0
+    while (action := stepped.step_forward()) is not None:
+        sent_messages += len(action["produced_messages"])
+        lost_messages += sum(1 for message in action["produced_messages"] if message["is_lost"])
+    simulator = create_flooding_simulator(reliability=0.7)
+    result = simulator.run()
+    assert result.stop_reason == StopReason.QUIESCENCE
+    assert result.steps == len(simulator.journal)
+    assert (result.sent_messages, result.lost_messages) == (sent_messages, lost_messages)
+    assert lost_messages > 0
+    assert (result.time, result.theta) == (simulator.time, simulator.theta)
+    assert fingerprint(simulator) == fingerprint(stepped)
+
+
+def test_run_stops_at_its_limits():
+    simulator = create_flooding_simulator()
+    result = simulator.run(max_steps=5)
+    assert (result.stop_reason, result.steps) == (StopReason.MAX_STEPS, 5)
+    max_time = simulator.time + 3
+    result = simulator.run(max_time=max_time)
+    assert result.stop_reason == StopReason.MAX_TIME
+    assert simulator.time <= max_time < simulator.find_next()[0]
+    steps = len(simulator.journal)
+    result = simulator.run(until=lambda s: len(s.journal) >= steps + 4)
+    assert (result.stop_reason, result.steps) == (StopReason.PREDICATE, 4)
+    assert simulator.run(until=lambda s: True).steps == 0
+
+
+def test_seek_matches_stepping_to_the_position():
+    for checkpoint_interval in [None, 3]:
+        reference = create_flooding_simulator(reliability=0.7, checkpoint_interval=checkpoint_interval)
+        reference.run()
+        positions = [(entry.time, entry.theta) for entry in reference.journal]
+        target = positions[len(positions) // 2]
+
+        stepped = create_flooding_simulator(reliability=0.7)
+        stepped.run(until=lambda s: (s.time, s.theta) == target)
+
+        # Backward from the end of the run, the steps to undo are found by bisection
+        result = reference.seek(*target)
+        assert (result.time, result.theta, result.reached) == (*target, True)
+        assert result.steps == -(len(positions) - len(positions) // 2 - 1)
+        assert fingerprint(reference) == fingerprint(stepped)
+
+        # Forward from the start
+        simulator = create_flooding_simulator(reliability=0.7, checkpoint_interval=checkpoint_interval)
+        result = simulator.seek(*target)
+        assert result.steps == len(positions) // 2 + 1
+        assert fingerprint(simulator) == fingerprint(stepped)
+
+        # A position without a message ends at the latest step before it
+        result = simulator.seek(target[0], target[1] + 1000)
+        assert (result.time, result.theta) == max(position for position in positions if position <= (target[0], target[1] + 1000))
+        result = simulator.seek(0, 0)
+        assert (result.time, result.theta, result.reached) == (None, None, True)
+        assert len(simulator.journal) == 0
+
+
+def test_step_backward_restores_every_earlier_step():
+    for checkpoint_interval in [None, 3]:
+        simulator = create_flooding_simulator(reliability=0.7, checkpoint_interval=checkpoint_interval)
+        fingerprints = [fingerprint(simulator) + (simulator.random_generator.bit_generator.state,)]
+        while simulator.step_forward() is not None:
+            fingerprints.append(fingerprint(simulator) + (simulator.random_generator.bit_generator.state,))
+        assert len(fingerprints) > 10
+        for expected in reversed(fingerprints[:-1]):
+            simulator.step_backward()
+            assert fingerprint(simulator) + (simulator.random_generator.bit_generator.state,) == expected
+        assert simulator.step_backward() is None
+        assert len(simulator.journal) == 0 and len(simulator.trace) == 0
@@ -0,0 +1,77 @@
+import io
+
+from DIAL import *
+
+
+def flooding_algorithm(state: State, message: Message) -> None:
+    if state.color == message.color:
+        return
+    state.color = message.color
+    state.data.setdefault("received", []).append(str(message.source_address))
+    for neighbor in state.neighbors:
+        if neighbor == state.address.node_name:
+            continue
+        m = message.copy()
+        m.source_address = state.address
+        m.target_address = state.address.copy(node=neighbor)
+        send(m)
+
+
+def create_topology() -> Topology:
+    edge_config = EdgeConfig(DefaultSchedulers.LOCAL_FIFO, EdgeDirection.BIDIRECTIONAL, reliability=0.8)
+    nodes = [str(node) for node in range(6)]
+    edges = [(nodes[node], nodes[(node + 1) % 6], edge_config) for node in range(6)]
+    edges += [(nodes[node], nodes[(node + 2) % 6], edge_config) for node in range(6)]
+    return Topology(nodes, edges)
+
+
+def create_simulator(checkpoint_interval: int | None = None) -> Simulator:
+    initial_messages = {
+        1: [Message(source_address="0/flooding/red", target_address="0/flooding/red", color=DefaultColors.RED)],
+        3: [Message(source_address="3/flooding/blue", target_address="3/flooding/blue", color=DefaultColors.BLUE)]
+    }
+    return Simulator(topology=create_topology(), algorithms={"flooding": flooding_algorithm},
+                     initial_messages=initial_messages, seed=11, checkpoint_interval=checkpoint_interval)
+
+
+def fingerprint(simulator: Simulator) -> tuple:
+    # Message IDs are counted globally, so messages sent after loading get other IDs than in the original run
+    messages = {time: [(str(message.source_address), str(message.target_address), str(message.color),
+                        message._is_lost, message._creation_time, message._creation_theta)
+                       for message in simulator.messages[time]]
+                for time in simulator.messages.times()}
+    states = {str(address): (str(history[-1].color), history[-1].data, history[-1].neighbors)
+              for address, history in simulator.states.items()}
+    return simulator.time, simulator.theta, messages, states, simulator.random_generator.bit_generator.state
+
+
+def test_loaded_snapshot_continues_like_the_original():
+    for checkpoint_interval in [None, 4]:
+        for include_topology in [True, False]:
+            uninterrupted = create_simulator(checkpoint_interval)
+            uninterrupted.run()
+            simulator = create_simulator(checkpoint_interval)
+            simulator.run(max_steps=12)
+            file = io.BytesIO()
+            save_snapshot(simulator, file, include_topology=include_topology, compressed=True)
+            file.seek(0)
+            topology = None if include_topology else create_topology()
+            loaded = load_snapshot(file, algorithms={"flooding": flooding_algorithm}, topology=topology)
+            assert fingerprint(loaded) == fingerprint(simulator)
+            assert len(loaded.trace) == 12
+            loaded.run()
+            assert len(loaded.trace) == len(uninterrupted.trace)
+            assert fingerprint(loaded) == fingerprint(uninterrupted)
+
+
+def test_loaded_snapshot_can_not_step_back_past_itself():
+    simulator = create_simulator()
+    simulator.run(max_steps=5)
+    file = io.BytesIO()
+    save_snapshot(simulator, file)
+    file.seek(0)
+    loaded = load_snapshot(file, algorithms={"flooding": flooding_algorithm})
+    loaded.step_forward()
+    assert loaded.step_backward() is not None
+    assert (loaded.time, loaded.theta) == (simulator.time, simulator.theta)
+    assert loaded.step_backward() is None
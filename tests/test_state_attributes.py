@@ -0,0 +1,110 @@
+from DIAL import *
+
+
+def counting_algorithm(state: State, message: Message) -> None:
+    state.visits = getattr(state, "visits", 0) + 1
+    if state.visits < 3:
+        m = message.copy()
+        m.source_address = state.address
+        m.target_address = state.address
+        send_to_self(m, 1)
+
+
+def create_simulator(checkpoint_interval: int | None = None) -> Simulator:
+    initial_message = Message(source_address="A/counting/instance", target_address="A/counting/instance")
+    return Simulator(
+        topology=Topology(["A"], [], all_nodes_have_loops=True),
+        algorithms={"counting": counting_algorithm},
+        initial_messages={1: [initial_message]},
+        checkpoint_interval=checkpoint_interval
+    )
+
+
+def visits(simulator: Simulator) -> int | None:
+    return getattr(simulator.states[Address.from_string("A/counting/instance")][-1], "visits", None)
+
+
+def test_attribute_survives_steps():
+    for checkpoint_interval in [None, 1, 2]:
+        simulator = create_simulator(checkpoint_interval)
+        result = simulator.run(max_steps=20)
+        assert result.steps == 3
+        assert visits(simulator) == 3
+
+
+def test_attribute_survives_step_backward():
+    for checkpoint_interval in [None, 1, 2]:
+        simulator = create_simulator(checkpoint_interval)
+        simulator.run(max_steps=20)
+        history = simulator.states[Address.from_string("A/counting/instance")]
+        assert [getattr(state, "visits", None) for state in history] == [None, 1, 2, 3]
+        simulator.step_backward()
+        assert visits(simulator) == 2
+        simulator.step_backward()
+        assert visits(simulator) == 1
+        history = simulator.states[Address.from_string("A/counting/instance")]
+        assert [getattr(state, "visits", None) for state in history] == [None, 1]
+
+
+def test_attribute_survives_trace_and_snapshot(tmp_path):
+    simulator = create_simulator()
+    with TraceWriter(simulator, str(tmp_path / "trace.log")):
+        simulator.run(max_steps=20)
+    topology = Topology(["A"], [], all_nodes_have_loops=True)
+    assert visits(load_trace(str(tmp_path / "trace.log"), topology, {"counting": counting_algorithm})) == 3
+    assert visits(load_trace(str(tmp_path / "trace.log"), topology, {"counting": counting_algorithm}, steps=2)) == 2
+    save_snapshot(simulator, str(tmp_path / "snapshot.npz"))
+    assert visits(load_snapshot(str(tmp_path / "snapshot.npz"), {"counting": counting_algorithm})) == 3
+
+
+
+def aliasing_data_algorithm(state: State, message: Message) -> None:
+    step = message.data["step"]
+    if step == 1:
+        state.data["a"] = state.data["b"] = []
+    elif step == 2:
+        state.data["a"].append(1)
+    if step < 3:
+        m = message.copy()
+        m.source_address = state.address
+        m.target_address = state.address
+        m.data["step"] += 1
+        send_to_self(m, 1)
+
+
+def aliasing_attribute_algorithm(state: State, message: Message) -> None:
+    step = message.data["step"]
+    if step == 1:
+        state.extra = []
+        state.data["a"] = state.extra
+    elif step == 2:
+        state.extra.append(1)
+    if step < 3:
+        m = message.copy()
+        m.source_address = state.address
+        m.target_address = state.address
+        m.data["step"] += 1
+        send_to_self(m, 1)
+
+
+def run_algorithm(algorithm) -> State:
+    initial_message = Message(source_address="A/alg/instance", target_address="A/alg/instance", data={"step": 1})
+    simulator = Simulator(
+        topology=Topology(["A"], [], all_nodes_have_loops=True),
+        algorithms={"alg": algorithm},
+        initial_messages={1: [initial_message]}
+    )
+    simulator.run()
+    return simulator.states[Address.from_string("A/alg/instance")][-1]
+
+
+def test_aliased_data_values_stay_aliased():
+    state = run_algorithm(aliasing_data_algorithm)
+    assert state.data == {"a": [1], "b": [1]}
+    assert state.data["a"] is state.data["b"]
+
+
+def test_attribute_aliased_with_data_stays_aliased():
+    state = run_algorithm(aliasing_attribute_algorithm)
+    assert state.data["a"] == [1]
+    assert state.data["a"] is state.extra
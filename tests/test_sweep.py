@@ -0,0 +1,42 @@
+import json
+
+import numpy
+
+from DIAL import *
+
+
+def flooding_algorithm(state: State, message: Message) -> None:
+    if state.color == message.color:
+        return
+    state.color = message.color
+    for neighbor in state.neighbors:
+        if neighbor == state.address.node_name:
+            continue
+        m = message.copy()
+        m.source_address = state.address
+        m.target_address = state.address.copy(node=neighbor)
+        send(m)
+
+
+def create_sweep(processes: int) -> Sweep:
+    edge_config = EdgeConfig(DefaultSchedulers.RANDOM, EdgeDirection.BIDIRECTIONAL)
+    topology = Topology(["A", "B", "C"], [("A", "B", edge_config), ("B", "C", edge_config), ("C", "A", edge_config)])
+    initial_message = Message(source_address="A/flooding/instance", target_address="A/flooding/instance",
+                              color=DefaultColors.RED)
+    return Sweep({"seed": numpy.arange(2), "reliability": numpy.linspace(0.5, 1.0, 2)}, processes=processes,
+                 topology=topology, algorithms={"flooding": flooding_algorithm},
+                 initial_messages={1: [initial_message]})
+
+
+def test_sweep_rows_contain_python_values():
+    rows = create_sweep(processes=1).run()
+    assert len(rows) == 4
+    assert [(row["seed"], row["reliability"]) for row in rows] == [("0", "0.5"), ("0", "1.0"), ("1", "0.5"), ("1", "1.0")]
+    json.dumps(rows)
+
+
+def test_sweep_results_do_not_depend_on_processes(tmp_path):
+    sequential = create_sweep(processes=1).run()
+    parallel = create_sweep(processes=2).run(str(tmp_path / "sweep.csv"))
+    assert parallel == sequential
+    assert len((tmp_path / "sweep.csv").read_text().splitlines()) == 5
@@ -0,0 +1,70 @@
+from DIAL import *
+
+
+def undirected_edges(topology: Topology) -> set[frozenset[str]]:
+    edges = {frozenset(edge) for edge in topology.edges.keys() if edge[0] != edge[1]}
+    # Every edge of the generators is bidirectional
+    assert all(topology.has_edge(target, source) for source, target in topology.edges.keys())
+    return edges
+
+
+def degrees(topology: Topology) -> list[int]:
+    return [len([neighbor for neighbor in topology.get_neighbors(node) if neighbor != node]) for node in topology.nodes]
+
+
+def test_grid_and_torus():
+    grid = TopologyGenerators.grid(4, 5)
+    assert grid.nodes == [str(node) for node in range(20)]
+    assert len(undirected_edges(grid)) == 4 * 4 + 3 * 5
+    assert grid.has_edge("0", "0") and grid.has_edge("0", "1") and grid.has_edge("0", "5")
+    assert sorted(set(degrees(grid))) == [2, 3, 4]
+    torus = TopologyGenerators.torus(4, 5)
+    assert len(undirected_edges(torus)) == 2 * 20
+    assert set(degrees(torus)) == {4}
+    assert torus.has_edge("4", "0") and torus.has_edge("15", "0")
+
+
+def test_edge_classes_get_their_own_config():
+    horizontal = EdgeConfig(DefaultSchedulers.RANDOM, EdgeDirection.BIDIRECTIONAL, reliability=0.5)
+    vertical = EdgeConfig(DefaultSchedulers.LOCAL_FIFO, EdgeDirection.BIDIRECTIONAL)
+    grid = TopologyGenerators.grid(2, 2, edge_config={"horizontal": horizontal, "vertical": vertical},
+                                   all_nodes_have_loops=False)
+    assert grid.get_edge_config("0", "1") is horizontal and grid.get_edge_config("1", "0") is horizontal
+    assert grid.get_edge_config("0", "2") is vertical
+    assert not grid.has_edge("0", "0")
+
+
+def test_random_regular():
+    topology = TopologyGenerators.random_regular(200, 5, random_generator=1)
+    assert set(degrees(topology)) == {5}
+    assert len(undirected_edges(topology)) == 200 * 5 // 2
+    assert undirected_edges(TopologyGenerators.random_regular(200, 5, random_generator=1)) == undirected_edges(topology)
+
+
+def test_erdos_renyi():
+    nodes = 400
+    topology = TopologyGenerators.erdos_renyi(nodes, 0.05, random_generator=2)
+    edge_count = len(undirected_edges(topology))
+    expected = 0.05 * nodes * (nodes - 1) / 2
+    assert abs(edge_count - expected) < 5 * expected ** 0.5
+    assert len(undirected_edges(TopologyGenerators.erdos_renyi(30, 1.0))) == 30 * 29 // 2
+    assert len(undirected_edges(TopologyGenerators.erdos_renyi(30, 0.0))) == 0
+
+
+def test_watts_strogatz():
+    lattice = TopologyGenerators.watts_strogatz(50, 4, 0.0)
+    assert set(degrees(lattice)) == {4}
+    assert lattice.has_edge("0", "2") and lattice.has_edge("49", "1")
+    rewired = TopologyGenerators.watts_strogatz(50, 4, 0.3, random_generator=3)
+    assert len(undirected_edges(rewired)) == 50 * 2
+    assert undirected_edges(rewired) != undirected_edges(lattice)
+
+
+def test_barabasi_albert():
+    nodes, attachments = 300, 3
+    topology = TopologyGenerators.barabasi_albert(nodes, attachments, random_generator=4)
+    seed_edges = (attachments + 1) * attachments // 2
+    assert len(undirected_edges(topology)) == seed_edges + (nodes - attachments - 1) * attachments
+    assert min(degrees(topology)) >= attachments
+    # Preferential attachment produces hubs
+    assert max(degrees(topology)) > 4 * attachments
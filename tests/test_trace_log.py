@@ -0,0 +1,72 @@
+from DIAL import *
+
+
+def flooding_algorithm(state: State, message: Message) -> None:
+    if state.color == message.color:
+        return
+    state.color = message.color
+    state.data.setdefault("received", []).append(str(message.source_address))
+    for neighbor in state.neighbors:
+        if neighbor == state.address.node_name:
+            continue
+        m = message.copy()
+        m.source_address = state.address
+        m.target_address = state.address.copy(node=neighbor)
+        send(m)
+
+
+def create_topology() -> Topology:
+    edge_config = EdgeConfig(DefaultSchedulers.RANDOM, EdgeDirection.BIDIRECTIONAL, reliability=0.8)
+    nodes = [str(node) for node in range(6)]
+    edges = [(nodes[node], nodes[(node + 1) % 6], edge_config) for node in range(6)]
+    edges += [(nodes[node], nodes[(node + 2) % 6], edge_config) for node in range(6)]
+    return Topology(nodes, edges)
+
+
+def create_simulator() -> Simulator:
+    initial_messages = {
+        1: [Message(source_address="0/flooding/red", target_address="0/flooding/red", color=DefaultColors.RED)],
+        3: [Message(source_address="3/flooding/blue", target_address="3/flooding/blue", color=DefaultColors.BLUE)]
+    }
+    return Simulator(topology=create_topology(), algorithms={"flooding": flooding_algorithm},
+                     initial_messages=initial_messages, seed=5)
+
+
+def fingerprint(simulator: Simulator) -> tuple:
+    messages = {time: [message.summary() for message in simulator.messages[time]]
+                for time in simulator.messages.times()}
+    states = {str(address): [(str(state.color), state.data) for state in history]
+              for address, history in simulator.states.items()}
+    return (simulator.time, simulator.theta, messages, states, simulator.random_generator.bit_generator.state,
+            {name: values.tolist() for name, values in simulator.trace_arrays().items()})
+
+
+def test_loaded_trace_matches_the_recorded_run(tmp_path):
+    path = str(tmp_path / "trace.log")
+    simulator = create_simulator()
+    with TraceWriter(simulator, path, chunk_size=4):
+        simulator.run(max_steps=10)
+        after_ten_steps = fingerprint(simulator)
+        # Undone steps are recorded as well, so the log ends where the simulator ended
+        for _ in range(3):
+            simulator.step_backward()
+        simulator.run()
+    assert simulator.trace_writer is None
+    loaded = load_trace(path, create_topology(), {"flooding": flooding_algorithm})
+    assert fingerprint(loaded) == fingerprint(simulator)
+    assert fingerprint(load_trace(path, create_topology(), {"flooding": flooding_algorithm}, steps=10)) == after_ten_steps
+
+
+def test_loaded_trace_can_be_continued(tmp_path):
+    path = str(tmp_path / "trace.log")
+    uninterrupted = create_simulator()
+    uninterrupted.run()
+    simulator = create_simulator()
+    with TraceWriter(simulator, path):
+        simulator.run(max_steps=8)
+    loaded = load_trace(path, create_topology(), {"flooding": flooding_algorithm})
+    loaded.run()
+    assert len(loaded.journal) == len(uninterrupted.journal)
+    assert ([(str(history[-1].color), history[-1].data) for history in loaded.states.values()] ==
+            [(str(history[-1].color), history[-1].data) for history in uninterrupted.states.values()])
+    assert loaded.step_backward() is not None